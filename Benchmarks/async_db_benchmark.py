@@ -0,0 +1,83 @@
+"""
+Compare blocking psycopg2 handlers with asyncpg handlers under concurrent slow queries.
+
+Both handlers run SELECT pg_sleep(delay) so the query time dominates. Sync
+handlers each hold one of Starlette's threadpool workers (40 by default) for
+the whole query, async handlers only hold a pooled connection. Both pools are
+sized above the threadpool so the threadpool is the limit being measured.
+
+Needs a local Postgres reachable with the DB_* variables of .env, and httpx:
+
+    pip install httpx
+    python Benchmarks/async_db_benchmark.py --requests 400 --delay 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DB_POOL_MAX", "200")
+os.environ.setdefault("ASYNC_DB_POOL_MAX", "200")
+
+import httpx
+from fastapi import FastAPI
+
+from async_database import async_db_connection, close_async_pool, init_async_pool
+from database import close_pool, db_connection, init_pool
+
+app = FastAPI()
+
+
+@app.get("/sync")
+def sync_query(delay: float):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_sleep(%s)", (delay,))
+        cursor.fetchall()
+    return "ok"
+
+
+@app.get("/async")
+async def async_query(delay: float):
+    async with async_db_connection() as conn:
+        await conn.fetch("SELECT pg_sleep($1)", delay)
+    return "ok"
+
+
+async def run(path, total, concurrency, delay):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def request():
+            async with semaphore:
+                response = await client.get(path, params={"delay": delay})
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(total)))
+        return time.perf_counter() - start
+
+
+async def main(args):
+    init_pool()
+    await init_async_pool()
+    try:
+        print(f"{args.requests} requests, {args.concurrency} in flight, {args.delay}s per query")
+        print(f"{'':8}{'seconds':>10}{'req/s':>10}")
+        for path in ("/sync", "/async"):
+            elapsed = await run(path, args.requests, args.concurrency, args.delay)
+            print(f"{path[1:]:8}{elapsed:>10.2f}{args.requests / elapsed:>10.1f}")
+    finally:
+        await close_async_pool()
+        close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""
+Run EarthEngineScheduler against a local fake Earth Engine client.
+
+The fake answers each call after a fixed latency and raises a 429 error when
+more than --server-limit calls run at once, like the Earth Engine concurrent
+request quota. A bulk job of --batch calls is started at BATCH priority, then
+--interactive calls arrive one after another at INTERACTIVE priority. Prints
+the interactive latencies, the batch duration and the 429 errors seen, with
+and without the scheduler:
+
+    python Benchmarks/ee_scheduler_benchmark.py --batch 200 --interactive 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ee_scheduler import BATCH, EarthEngineQuotaError, EarthEngineScheduler, priority
+from executor import run_for_regions
+
+
+class FakeQuotaError(Exception):
+    def __init__(self):
+        super().__init__("429 Too Many Requests: concurrent request quota exceeded")
+        self.status_code = 429
+
+
+class FakeEarthEngine:
+    def __init__(self, latency, limit):
+        self.latency = latency
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.running = 0
+        self.rejected = 0
+
+    def compute(self, value):
+        with self.lock:
+            if self.running >= self.limit:
+                self.rejected += 1
+                raise FakeQuotaError()
+            self.running += 1
+        try:
+            time.sleep(self.latency)
+            return {"value": value}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def run(args, scheduled):
+    client = FakeEarthEngine(args.latency, args.server_limit)
+    scheduler = EarthEngineScheduler(
+        rate=args.rate, burst=args.server_limit, max_concurrent=args.server_limit,
+        max_retries=5, backoff_base=args.latency, backoff_max=1
+    )
+
+    def call(value):
+        if scheduled:
+            return scheduler.call(client.compute, value)
+        return client.compute(value)
+
+    def batch_job():
+        with priority(BATCH):
+            return run_for_regions(call, range(args.batch), max_workers=args.batch_workers)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as background:
+        job = background.submit(batch_job)
+        time.sleep(args.latency)
+
+        latencies, failures = [], 0
+        for value in range(args.interactive):
+            call_start = time.perf_counter()
+            try:
+                call(value)
+                latencies.append(time.perf_counter() - call_start)
+            except (FakeQuotaError, EarthEngineQuotaError):
+                failures += 1
+            time.sleep(args.latency / 2)
+        batch_errors = sum(1 for _, _, error in job.result() if error is not None)
+    return {
+        "interactive_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "interactive_max_ms": max(latencies) * 1000 if latencies else float("nan"),
+        "interactive_failed": failures,
+        "batch_failed": batch_errors,
+        "batch_s": time.perf_counter() - start,
+        "rejected": client.rejected
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--batch-workers", type=int, default=16)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--server-limit", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=200)
+    args = parser.parse_args()
+
+    print(f"{'':10}{'p50 ms':>10}{'max ms':>10}{'failed':>8}{'batch failed':>14}{'total s':>9}{'429s':>7}")
+    for name, scheduled in (("direct", False), ("scheduled", True)):
+        result = run(args, scheduled)
+        print(
+            f"{name:10}{result['interactive_ms']:>10.1f}{result['interactive_max_ms']:>10.1f}"
+            f"{result['interactive_failed']:>8}{result['batch_failed']:>14}{result['batch_s']:>9.2f}"
+            f"{result['rejected']:>7}"
+        )
@@ -0,0 +1,65 @@
+"""
+Compare poverty_model.pkl with the NumPy evaluator in forest_inference.py.
+
+Reports load time, resident memory after loading, and single-row and batch
+prediction latency. Run from the repository root after exporting the model:
+
+    python forest_inference.py
+    python Benchmarks/forest_inference_benchmark.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so the resident memory only reflects one loader
+CHILD = """
+import json, pickle, resource, sys, time, timeit, warnings
+import numpy as np
+warnings.filterwarnings("ignore")
+sys.path.insert(0, sys.argv[2])
+from forest_inference import load_forest
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if sys.argv[1] == "pickle":
+    with open("poverty_model.pkl", "rb") as f:
+        model = pickle.load(f)
+else:
+    model = load_forest()
+load_time = time.perf_counter() - start
+memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+rng = np.random.default_rng(0)
+single = rng.uniform([0, 0], [30, 2e7], size=(1, 2))
+batch = rng.uniform([0, 0], [30, 2e7], size=(1000, 2))
+model.predict(single)
+single_time = min(timeit.repeat(lambda: model.predict(single), number=100, repeat=5)) / 100
+batch_time = min(timeit.repeat(lambda: model.predict(batch), number=10, repeat=5)) / 10
+print(json.dumps({
+    "load_ms": load_time * 1000,
+    "rss_kb": memory,
+    "single_ms": single_time * 1000,
+    "batch_1000_ms": batch_time * 1000
+}))
+"""
+
+
+def run(loader):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, loader, ROOT],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    results = {loader: run(loader) for loader in ("pickle", "arrays")}
+    print(f"{'':10}{'load ms':>10}{'rss KB':>10}{'1 row ms':>10}{'1000 rows ms':>14}")
+    for loader, result in results.items():
+        print(
+            f"{loader:10}{result['load_ms']:>10.1f}{result['rss_kb']:>10}"
+            f"{result['single_ms']:>10.3f}{result['batch_1000_ms']:>14.2f}"
+        )
@@ -0,0 +1,131 @@
+"""
+Compare building JSON responses in Python with letting Postgres build them.
+
+A 10k row table with numeric, date and timestamp columns is created, read
+three ways, and dropped again:
+
+    python      psycopg2 fetchall, dicts zipped from cursor.description,
+                jsonable_encoder and json.dumps (the previous endpoints)
+    asyncpg     fetch_page dicts, jsonable_encoder and json.dumps
+    postgres    fetch_page_json, json_agg bytes sent as is
+
+The decoded outputs are compared so numerics and dates must match. Needs a
+local Postgres reachable with the DB_* variables of .env:
+
+    python Benchmarks/json_assembly_benchmark.py --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MAX_PAGE_SIZE", "100000")
+
+from fastapi.encoders import jsonable_encoder
+
+from async_database import close_async_pool, fetch_page, fetch_page_json, init_async_pool
+from database import close_pool, db_connection
+
+TABLE = "benchmark_json_rows"
+
+
+def create_table(rows):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(f"""
+            CREATE TABLE {TABLE} (
+                id serial PRIMARY KEY,
+                name text,
+                amount numeric(16, 2),
+                rate double precision,
+                issued date,
+                updated_at timestamp
+            )
+        """)
+        cursor.execute(f"""
+            INSERT INTO {TABLE} (name, amount, rate, issued, updated_at)
+            SELECT 'green credit ' || i, (i * 1234.56)::numeric(16, 2), i / 7.0,
+                   date '2024-01-01' + i % 365, timestamp '2024-01-01 08:30:00' + i * interval '1 minute'
+            FROM generate_series(1, %s) AS i
+        """, (rows,))
+        conn.commit()
+
+
+def drop_table():
+    with db_connection() as conn:
+        conn.cursor().execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.commit()
+
+
+def python_path(rows):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM {TABLE} ORDER BY id LIMIT %s", (rows,))
+        fetched = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+    result = []
+    for row in fetched:
+        row_dict = {}
+        for key, value in zip(columns, row):
+            row_dict[key] = value
+        result.append(row_dict)
+    return json.dumps(jsonable_encoder(result)).encode()
+
+
+async def asyncpg_path(rows):
+    return json.dumps(jsonable_encoder(await fetch_page(TABLE, limit=rows))).encode()
+
+
+async def postgres_path(rows):
+    body, _, _ = await fetch_page_json(TABLE, limit=rows)
+    return body
+
+
+async def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def normalized(body):
+    # Decimals are floats after jsonable_encoder, compare on that common ground
+    return [{key: float(value) if isinstance(value, (int, float)) else value for key, value in row.items()}
+            for row in json.loads(body)]
+
+
+async def main(args):
+    create_table(args.rows)
+    await init_async_pool()
+    try:
+        loop = asyncio.get_running_loop()
+        paths = {
+            "python": lambda: loop.run_in_executor(None, python_path, args.rows),
+            "asyncpg": lambda: asyncpg_path(args.rows),
+            "postgres": lambda: postgres_path(args.rows)
+        }
+        results = {name: await timed(func, args.repeat) for name, func in paths.items()}
+
+        expected = normalized(results["python"][1])
+        print(f"{args.rows} rows, best of {args.repeat}")
+        print(f"{'':10}{'ms':>10}{'KB':>10}{'same':>6}")
+        for name, (elapsed, body) in results.items():
+            print(f"{name:10}{elapsed * 1000:>10.1f}{len(body) / 1024:>10.0f}{str(normalized(body) == expected):>6}")
+    finally:
+        await close_async_pool()
+        drop_table()
+        close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""
+Exercise NewsFetcher against a local HTTP stub serving fixture tag pages.
+
+The stub answers If-None-Match with 304 and can delay
+every response to show the effect of fetching concurrently. Prints the
+time and the download/304/parse counts of a cold fetch, a revalidation
+with nothing changed, and one after a page changed:
+
+    python Benchmarks/news_fetcher_benchmark.py --pages 4 --delay 0.2
+"""
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_ingestor import NewsFetcher
+
+FIXTURE = """<html><body>
+<h2>Pemkot bangun hutan kota baru di {page}</h2>
+<h2>Panel surya atap untuk sekolah di {page}</h2>
+<h2>Revisi {revision}: mangrove dan reforestasi pesisir</h2>
+</body></html>"""
+
+
+def stub_server(pages, delay):
+    revisions = {f"/tag/{page}": 1 for page in range(pages)}
+    modified = formatdate(time.time() - 3600, usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            if self.path not in revisions:
+                self.send_error(404)
+                return
+            body = FIXTURE.format(page=self.path, revision=revisions[self.path]).encode()
+            etag = '"' + hashlib.md5(body + self.server.etag_salt.encode()).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    # Changing it changes every ETag but no page body
+    server.etag_salt = ""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, revisions
+
+
+def timed_fetch(fetcher, sites):
+    before = dict(fetcher.stats)
+    start = time.perf_counter()
+    pages = fetcher.fetch(sites)
+    elapsed = time.perf_counter() - start
+    delta = {key: fetcher.stats[key] - before[key] for key in before}
+    return elapsed, pages, delta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server, revisions = stub_server(args.pages, args.delay)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    sites = [f"{base}{path}" for path in revisions]
+    fetcher = NewsFetcher()
+
+    print(f"{args.pages} pages, {args.delay}s per response")
+    print(f"{'':12}{'ms':>8}{'200':>6}{'304':>6}{'parsed':>8}")
+    runs = [("cold", None), ("unchanged", None), ("one changed", "/tag/0")]
+    for name, changed in runs:
+        if changed:
+            revisions[changed] += 1
+        elapsed, pages, delta = timed_fetch(fetcher, sites)
+        print(f"{name:12}{elapsed * 1000:>8.0f}{delta['downloaded']:>6}{delta['not_modified']:>6}{delta['parsed']:>8}")
+        assert all(len(headlines) == 3 for headlines in pages.values())
+    server.shutdown()
@@ -0,0 +1,58 @@
+"""
+Build and query SpatialIndex over random village-level points in Indonesia.
+
+Reports the build time and the single query latency for k=1 and k=10, and
+checks every answer against a brute force haversine search:
+
+    python Benchmarks/spatial_index_benchmark.py --points 50000
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+# Rough bounding box of Indonesia
+BOUNDS = ([-11.0, 95.0], [6.0, 141.0])
+
+
+def haversine(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(*BOUNDS, size=(args.points, 2))
+    queries = rng.uniform(*BOUNDS, size=(args.queries, 2))
+
+    start = time.perf_counter()
+    import scipy.spatial  # noqa: F401
+    scipy_import = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SpatialIndex((i, (lat, lon)) for i, (lat, lon) in enumerate(points))
+    build = time.perf_counter() - start
+
+    for lat, lon in queries:
+        expected = np.argsort(haversine(lat, lon, points[:, 0], points[:, 1]), kind="stable")[:10]
+        found = [key for key, _, _ in index.nearest(lat, lon, k=10)]
+        assert found == expected.tolist(), (lat, lon)
+
+    print(f"{args.points} points, scipy import {scipy_import * 1000:.1f} ms, build {build * 1000:.1f} ms")
+    for k in (1, 10):
+        lat, lon = queries[0]
+        seconds = min(timeit.repeat(lambda: index.nearest(lat, lon, k=k), number=1000, repeat=5)) / 1000
+        print(f"k={k:<3} {seconds * 1e6:8.1f} µs per query")
@@ -0,0 +1,68 @@
+"""
+Measure the cold start of app.py: import time, lifespan startup and the
+first response of /health, each in a fresh interpreter.
+
+Run from the repository root, it exits with status 1 when the median import
+or time-to-first-response exceeds its budget so it can gate a deploy:
+
+    pip install httpx
+    python Benchmarks/startup_benchmark.py --runs 5 --import-budget-ms 3000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    started = time.perf_counter()
+    response = client.get("/health")
+    responded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_response_ms": (responded - start) * 1000,
+    "status": response.status_code
+}))
+"""
+
+
+def run(warm_up):
+    env = dict(os.environ, WARM_UP=warm_up)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, ROOT], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm-up", default="background", choices=["background", "blocking", "off"])
+    parser.add_argument("--import-budget-ms", type=float, default=3000)
+    parser.add_argument("--first-response-budget-ms", type=float, default=5000)
+    args = parser.parse_args()
+
+    runs = [run(args.warm_up) for _ in range(args.runs)]
+    medians = {key: statistics.median(result[key] for result in runs)
+               for key in ("import_ms", "startup_ms", "first_response_ms")}
+    print(f"WARM_UP={args.warm_up}, median of {args.runs} runs")
+    for key, value in medians.items():
+        print(f"{key:20}{value:>10.1f}")
+
+    over_budget = medians["import_ms"] > args.import_budget_ms \
+        or medians["first_response_ms"] > args.first_response_budget_ms
+    if over_budget:
+        print("Cold start over budget")
+    sys.exit(1 if over_budget else 0)
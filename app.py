@@ -1,18 +1,92 @@
 from fastapi import FastAPI
 import ee
+import os
 import pickle
-import psycopg2
+import asyncio
+import threading
 import numpy as np
-import requests
-from bs4 import BeautifulSoup
-import random
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-import os
-from typing import Optional,Dict
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional,Dict,List
+from pydantic import BaseModel
+import psycopg2
+from psycopg2.extras import execute_batch
+from earth_engine import (
+    ENVIRONMENTAL_DATASETS, convert_environmental_values, earth_engine_session, GEOSPATIAL_DATASETS,
+    GEOSPATIAL_WINDOW_END, geospatial_area, geospatial_composite
+)
+from batch_engine import fetch_all_geospatial_data
+from executor import run_for_regions, iter_for_regions
+from metrics_cache import metrics_cache
+from regions import province_coords, coordinate_key
+from poverty_features import load_poverty_features
+from forest_inference import load_forest
+from database import db_connection, init_pool, close_pool
+from async_database import (
+    init_async_pool, close_async_pool, fetch_page_json, fetch_json, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from json_responses import RawJSONResponse
+from streaming import stream_records
+from news_ingestor import NewsIngestor
+from lazy_init import LazyInitializer
+from region_engine import (
+    PROFILES, MetricProfile, cached_metrics, point_metrics, prefetch_metrics, register_profile,
+    router as region_router
+)
+from score_grid import router as score_grid_router
+from ee_scheduler import BATCH, EarthEngineQuotaError, ee_scheduler, get_info, priority
+from scoring import (
+    ENVIRONMENTAL_WEIGHTS, INVESTMENT_WEIGHTS, environmental_score, investment_score, region_environmental_scores,
+    region_investment_scores, weight_sweep
+)
+
+# "background" warms Earth Engine and the model after startup, "blocking"
+# before serving, "off" leaves it to the first request that needs them
+WARM_UP = os.getenv("WARM_UP", "background")
+
+# The exported node arrays avoid unpickling sklearn, the pickle is the fallback
+def load_poverty_model():
+    try:
+        model = load_forest()
+        if model is None:
+            with open("poverty_model.pkl", "rb") as f:
+                model = pickle.load(f)
+        return model
+    except Exception as e:
+        print("Error loading poverty model:", str(e))
+        return None
+
+poverty_model_loader = LazyInitializer("poverty model", load_poverty_model)
 
-app = FastAPI()
+def warm_up():
+    earth_engine_session.warm()
+    poverty_model_loader.warm()
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        init_pool()
+    except Exception as e:
+        print("Error creating database pool:", str(e))
+    try:
+        await init_async_pool()
+    except Exception as e:
+        print("Error creating async database pool:", str(e))
+    news_ingestor.start()
+    if WARM_UP == "blocking":
+        await asyncio.to_thread(warm_up)
+    elif WARM_UP == "background":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+    yield
+
+    news_ingestor.stop()
+    close_pool()
+    await close_async_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,17 +96,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-try:
-    ee.Initialize(project='davidsiddiii')
-except Exception as e:
-    print("Error initializing Earth Engine:", str(e))
+@app.get("/health")
+def health():
+    return {
+        "earth_engine": earth_engine_session.loaded,
+        "poverty_model": poverty_model_loader.loaded,
+        "in_flight_computations": len(metrics_cache.in_flight.in_flight()),
+        "earth_engine_scheduler": ee_scheduler.stats()
+    }
 
-try:
-    with open("poverty_model.pkl", "rb") as f:
-        poverty_model = pickle.load(f)
-except Exception as e:
-    print("Error loading poverty model:", str(e))
-    poverty_model = None
+# Fixed-window poverty features built by poverty_features.py, Earth Engine is
+# only queried for regions missing from the artifact
+poverty_features = load_poverty_features()
 
 # List of Indonesian provinces
 provinces = [
@@ -43,77 +118,6 @@ provinces = [
     "gorontalo", "sulawesi barat", "maluku", "maluku utara", "papua", "papua barat", "papua selatan", "papua tengah", "papua pegunungan", "sidoarjo", "bantul", "jakarta pusat"
 ]
 
-# Green infrastructure & renewable energy mappings
-green_infra_mapping = {
-    "Roof Garden": ["roof garden", "atap hijau"],
-    "Mangrove Reforestation": ["mangrove", "reforestasi"],
-    "Rain Water Harvesting": ["air hujan", "penampungan air"],
-    "Energy Efficient Building": ["hemat energi", "bangunan hijau"],
-    "Sustainable Transportation": ["transportasi berkelanjutan", "kendaraan listrik"],
-    "Biopore": ["biopori"],
-    "Ecotourism": ["ekowisata", "wisata hijau"],
-    "Urban Forest": ["hutan kota"],
-    "Green Wall": ["dinding hijau", "vertical garden"],
-    "Solar Panel": ["solar panel", "energi surya"],
-    "Green Wastewater Engineering": ["air limbah", "pengolahan limbah"],
-    "Green Corridor": ["jalur hijau", "jalan hijau"],
-    "Biofuel Plantations": ["biofuel", "energi biomassa"]
-}
-
-renewable_energy_mapping = {
-    "Solar Energy": ["solar", "energi surya", "panel surya"],
-    "Wind Energy": ["angin", "turbin angin"],
-    "Hydro Energy": ["hidro", "energi air", "pembangkit listrik tenaga air"],
-    "Geothermal": ["geotermal", "panas bumi"],
-    "Biomass": ["biomassa", "biofuel"]
-}
-
-# News sources
-news_sites = ["https://www.kompas.com/tag/infrastruktur-hijau", "https://www.detik.com/tag/infrastruktur-hijau"]
-energy_sites = ["https://www.kompas.com/tag/energi-terbarukan", "https://www.detik.com/tag/energi-terbarukan"]
-
-province_coords = {
-    "aceh": (4.6951, 96.7494),
-    "sumatera utara": (2.1154, 99.5451),
-    "sumatera barat": (-0.7399, 100.8000),
-    "riau": (0.5071, 101.4478),
-    "jambi": (-1.4852, 102.4381),
-    "sumatera selatan": (-3.3194, 103.9144),
-    "bengkulu": (-3.7928, 102.2601),
-    "lampung": (-4.5586, 105.4068),
-    "bangka belitung": (-2.7410, 106.4406),
-    "kepulauan riau": (3.9457, 108.1429),
-    "dki jakarta": (-6.2088, 106.8456),
-    "jawa barat": (-6.8894, 107.6405),
-    "jawa tengah": (-7.1500, 110.1403),
-    "di yogyakarta": (-7.7956, 110.3695),
-    "jawa timur": (-7.2504, 112.7688),
-    "banten": (-6.4058, 106.0640),
-    "bali": (-8.3405, 115.0920),
-    "nusa tenggara barat": (-8.6529, 117.3616),
-    "nusa tenggara timur": (-8.6574, 121.0794),
-    "kalimantan barat": (0.1326, 111.0966),
-    "kalimantan tengah": (-1.6815, 113.3824),
-    "kalimantan selatan": (-3.0926, 115.2838),
-    "kalimantan timur": (1.6407, 116.4194),
-    "kalimantan utara": (3.5071, 117.4991),
-    "sulawesi utara": (1.4025, 124.9831),
-    "sulawesi tengah": (-1.4305, 120.7655),
-    "sulawesi selatan": (-3.6688, 119.9741),
-    "sulawesi tenggara": (-4.1461, 122.1743),
-    "gorontalo": (0.6994, 122.4467),
-    "sulawesi barat": (-2.8440, 119.2321),
-    "maluku": (-3.2385, 130.1453),
-    "maluku utara": (0.6348, 127.9721),
-    "papua": (-4.2699, 138.0804),
-    "papua barat": (-1.3361, 133.1747),
-    "papua selatan": (-7.6710, 138.7648),
-    "papua tengah": (-3.9917, 136.2804),
-    "papua pegunungan": (-4.5415, 138.1185),
-    "sidoarjo": (-7.4545375,112.5005207),
-    "bantul": (-7.902243,110.2863846),
-    "jakarta pusat": (-6.1822261,106.7952647)
-}
 # Green infrastructure cost assumptions (in billion IDR)
 green_infra_costs = {
     "Roof Garden": 5.2,
@@ -130,251 +134,176 @@ green_infra_costs = {
     "Jalur Hijau": 5.5,
     "Biofuel Plantations": 11.3
 }
-def get_db_connection():
-    load_dotenv()
-    return psycopg2.connect(
-        dbname=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST"),
-        port=os.getenv("DB_PORT")
-    )
-    
-def scrape_news(sites):
-    articles = []
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    for site in sites:
-        try:
-            response = requests.get(site, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                articles.extend([article.text.strip().lower() for article in soup.find_all('h2')])
-        except Exception as e:
-            print(f"Error scraping {site}: {e}")
-    return articles if articles else ["No relevant news found"]
-
-def get_category(title, mapping):
-    title_lower = title.lower()
-    for category, keywords in mapping.items():
-        if any(keyword in title_lower for keyword in keywords):
-            return category
-    return random.choice(list(mapping.keys()))
-
-articles = scrape_news(news_sites)
-energy_articles = scrape_news(energy_sites)
-
-infra_results = {province: get_category(random.choice(articles), green_infra_mapping) for province in provinces}
-renewable_results = {province: get_category(random.choice(energy_articles), renewable_energy_mapping) for province in provinces}
+max_infra_cost = max(green_infra_costs.values())
+
+# Categories come from the snapshot of the background news ingestor, loading
+# it is instant and every worker serves the same assignment. Scoring
+# endpoints wait for it through news_ingestor.wait_ready(), which builds the
+# first snapshot when the lifespan did not, so "Not Available" is only a
+# timeout fallback.
+news_ingestor = NewsIngestor(provinces)
+news_ingestor.reload()
+infra_results = news_ingestor.infra_results
+renewable_results = news_ingestor.renewable_results
 
 def fetch_environmental_data(province):
     if province not in province_coords:
         return {"error": "Invalid province"}
 
-    lat, lon = province_coords[province]
-    point = ee.Geometry.Point(lon, lat)
-
-    end_date = datetime.today().strftime('%Y-%m-%d')
-    start_date = (datetime.today() - timedelta(days=365)).strftime('%Y-%m-%d')
-
     try:
-        ndvi_image = ee.ImageCollection("MODIS/061/MOD13Q1") \
-            .filterDate(start_date, end_date) \
-            .select("NDVI") \
-            .map(lambda img: img.updateMask(img.gt(0))) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=250, bestEffort=True)
-
-        precipitation_image = ee.ImageCollection("UCSB-CHG/CHIRPS/DAILY") \
-            .filterDate(start_date, end_date) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point, scale=500, bestEffort=True)
-
-        soil_moisture_image = ee.ImageCollection("COPERNICUS/S1_GRD") \
-            .filterBounds(point) \
-            .filterDate(start_date, end_date) \
-            .select("VV") \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point, scale=500, bestEffort=True)
-        
-        no2_image = ee.ImageCollection("COPERNICUS/S5P/NRTI/L3_NO2") \
-            .filterDate(start_date, end_date) \
-            .select("NO2_column_number_density") \
-            .map(lambda img: img.updateMask(img.gt(0))) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=1000, bestEffort=True)
-        
-        co_image = ee.ImageCollection("COPERNICUS/S5P/NRTI/L3_CO") \
-            .filterDate(start_date, end_date) \
-            .select("CO_column_number_density") \
-            .map(lambda img: img.updateMask(img.gt(0))) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=1000, bestEffort=True)
-        
-        so2_image = ee.ImageCollection("COPERNICUS/S5P/NRTI/L3_SO2") \
-            .filterDate(start_date, end_date) \
-            .select("SO2_column_number_density") \
-            .map(lambda img: img.updateMask(img.gt(0))) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=1000, bestEffort=True)
-        
-        o3_image = ee.ImageCollection("COPERNICUS/S5P/NRTI/L3_O3") \
-            .filterDate(start_date, end_date) \
-            .select("O3_column_number_density") \
-            .map(lambda img: img.updateMask(img.gt(0))) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=1000, bestEffort=True)
-        
-        aod_image = ee.ImageCollection("MODIS/006/MCD19A2_GRANULES") \
-            .filterDate(start_date, end_date) \
-            .select("Optical_Depth_055") \
-            .map(lambda img: img.updateMask(img.gt(0))) \
-            .mean() \
-            .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=1000, bestEffort=True)
-        
-        aod_value = aod_image.getInfo().get("Optical_Depth_055", 0)
-        estimated_pm25 = aod_value * 10  
-        try:
-            pm_image = ee.ImageCollection("NASA/GEOS-CF/v1/rpl/htf") \
-                .filterDate(start_date, end_date) \
-                .select("PM25") \
-                .mean() \
-                .reduceRegion(reducer=ee.Reducer.mean(), geometry=point.buffer(10000), scale=1000, bestEffort=True)
-            pm25_value = pm_image.getInfo().get("PM25", estimated_pm25)
-        except:
-            pm25_value = estimated_pm25
-
-        return {
-            "ndvi": round(ndvi_image.getInfo().get("NDVI", 0) * 0.0001, 2),
-            "precipitation": round(precipitation_image.getInfo().get("precipitation", 0), 1),
-            "sentinel": round(soil_moisture_image.getInfo().get("VV", 0), 3),
-            "no2": round(no2_image.getInfo().get("NO2_column_number_density", 0) * 1000000, 3), 
-            "co": round(co_image.getInfo().get("CO_column_number_density", 0) * 1000, 3), 
-            "so2": round(so2_image.getInfo().get("SO2_column_number_density", 0) * 1000000, 3), 
-            "o3": round(o3_image.getInfo().get("O3_column_number_density", 0) / 2241.15, 3),  
-            "pm25": round(pm25_value, 1)  
-        }
+        # Same path as /regions/provinces/full and /score-at: the monthly
+        # aggregates when they cover the window, else the cached metrics, which
+        # share the raw dataset values and in-flight computations
+        return point_metrics(PROFILES["full"], province_coords[province])
+    except EarthEngineQuotaError as e:
+        print("Error fetching environmental data:", str(e))
+        return {"error": "Earth Engine quota exceeded, try again later"}
     except Exception as e:
         print("Error fetching environmental data:", str(e))
         return {"error": "Failed to fetch environmental data"}
     
     
+def compute_geospatial_data(province):
+    earth_engine_session.get()
+    lat, lon = province_coords[province]
+    buffered_point = geospatial_area(ee.Geometry.Point(lon, lat))
+
+    night_lights_result = geospatial_composite("night_lights").reduceRegion(
+        reducer=ee.Reducer.mean(), 
+        geometry=buffered_point, 
+        scale=GEOSPATIAL_DATASETS["night_lights"]["scale"], 
+        bestEffort=True
+    )
+    
+    night_lights = get_info(night_lights_result).get("avg_rad")
+    
+    daylight_result = geospatial_composite("daylight_duration").reduceRegion(
+        reducer=ee.Reducer.mean(), 
+        geometry=buffered_point, 
+        scale=GEOSPATIAL_DATASETS["daylight_duration"]["scale"], 
+        bestEffort=True
+    )
+    
+    daylight_duration = get_info(daylight_result).get("surface_solar_radiation_downwards_sum")
+    
+    print(f"Province: {province}, Night Lights: {night_lights}, Daylight: {daylight_duration}")
+    
+    if night_lights is None:
+        print(f"Warning: Night lights data unavailable for {province}")
+        night_lights = 0.0
+        
+    if daylight_duration is None:
+        print(f"Warning: Daylight duration data unavailable for {province}")
+        daylight_duration = 0.0
+        
+    return [float(night_lights), float(daylight_duration)]
+
 def fetch_geospatial_data(province):
     if province not in province_coords:
         return {"error": "Invalid province"}
 
-    lat, lon = province_coords[province]
-    point = ee.Geometry.Point(lon, lat).buffer(5000)
-
-    end_date = ee.Date("2024-01-01")
-    start_date = end_date.advance(-60, "day")
-
-    buffered_point = point.buffer(1000)
+    if province in poverty_features:
+        return poverty_features[province]
 
     try:
-        viirs = ee.ImageCollection("NOAA/VIIRS/DNB/MONTHLY_V1/VCMSLCFG")\
-            .filterDate(start_date, end_date)\
-            .select("avg_rad")\
-            .mean()
-        
-        night_lights_result = viirs.reduceRegion(
-            reducer=ee.Reducer.mean(), 
-            geometry=buffered_point, 
-            scale=500, 
-            bestEffort=True
+        night_lights, daylight_duration = metrics_cache.get_or_compute(
+            province, "geospatial", GEOSPATIAL_WINDOW_END, lambda: compute_geospatial_data(province)
         )
-        
-        night_lights = night_lights_result.getInfo().get("avg_rad")
-        
-        solar = ee.ImageCollection("ECMWF/ERA5_LAND/MONTHLY")\
-            .filterDate(start_date, end_date)\
-            .select("surface_solar_radiation_downwards_sum")\
-            .mean()
-            
-        daylight_result = solar.reduceRegion(
-            reducer=ee.Reducer.mean(), 
-            geometry=buffered_point, 
-            scale=1000, 
-            bestEffort=True
-        )
-        
-        daylight_duration = daylight_result.getInfo().get("surface_solar_radiation_downwards_sum")
-        
-        print(f"Province: {province}, Night Lights: {night_lights}, Daylight: {daylight_duration}")
-        
-        if night_lights is None:
-            print(f"Warning: Night lights data unavailable for {province}")
-            night_lights = 0.0
-            
-        if daylight_duration is None:
-            print(f"Warning: Daylight duration data unavailable for {province}")
-            daylight_duration = 0.0
-            
-        return float(night_lights), float(daylight_duration)
-        
+        return night_lights, daylight_duration
     except Exception as e:
         print(f"Error fetching geospatial data for {province}: {str(e)}")
         return 0.0, 0.0
 
-def predict_poverty_index(province):
+def predict_poverty_indices(geospatial_data):
+    """
+    Predict the poverty index of many regions with a single model call.
+    
+    Parameters:
+    geospatial_data (Dict): Region name to (night_lights, daylight_duration)
+    
+    Returns:
+    Dict: Region name to poverty index, or an error message like predict_poverty_index
+    """
+    poverty_model = poverty_model_loader.get()
     if poverty_model is None:
-        return "Model not available"
+        return {region: "Model not available" for region in geospatial_data}
 
-    try:
-        night_lights, daylight_duration = fetch_geospatial_data(province)
-        
-        if isinstance(night_lights, dict) and "error" in night_lights:
-            print(f"Error for {province}: {night_lights['error']}")
-            return "Data unavailable"
-        
-        features = np.array([[night_lights, daylight_duration]])
-        predicted_poverty = poverty_model.predict(features)[0]
-        
-        return round(predicted_poverty, 2)
-    except Exception as e:
-        print(f"Error predicting poverty index for {province}: {str(e)}")
-        return "Prediction error"
+    results = {}
+    rows = []
+    for region, features in geospatial_data.items():
+        if isinstance(features, dict) and "error" in features:
+            print(f"Error for {region}: {features['error']}")
+            results[region] = "Data unavailable"
+        else:
+            rows.append(region)
+
+    if rows:
+        try:
+            features = np.array([geospatial_data[region] for region in rows], dtype=float)
+            for region, predicted_poverty in zip(rows, poverty_model.predict(features)):
+                results[region] = round(predicted_poverty, 2)
+        except Exception as e:
+            print(f"Error predicting poverty index for {len(rows)} regions: {str(e)}")
+            results.update({region: "Prediction error" for region in rows})
+
+    return {region: results[region] for region in geospatial_data}
+
+def predict_poverty_index(province, geospatial_data=None):
+    return predict_poverty_indices({province: geospatial_data or fetch_geospatial_data(province)})[province]
+
+def predict_all_poverty_indices(regions):
+    geospatial_data = {region: poverty_features.get(region) for region in regions}
+    missing = {region: province_coords[region] for region, features in geospatial_data.items() if features is None}
+    if missing:
+        try:
+            earth_engine_session.get()
+            geospatial_data.update(fetch_all_geospatial_data(missing))
+        except Exception as e:
+            print("Error fetching batch geospatial data:", str(e))
+            for region, result, error in run_for_regions(fetch_geospatial_data, missing):
+                geospatial_data[region] = result if error is None else (0.0, 0.0)
+    return predict_poverty_indices(geospatial_data)
     
 
-def calculate_environmental_score(env_data: Dict) -> float:
+def calculate_environmental_scores(env_data_list):
     """
-    Calculate environmental score based on NDVI, precipitation, and soil moisture.
+    Calculate the environmental score of many regions in one vectorized pass.
     
     Parameters:
-    env_data (Dict): Dictionary containing environmental metrics
+    env_data_list (List[Dict]): Environmental data dictionary of each region
     
     Returns:
-    float: Environmental score between 0-100
+    np.ndarray: Environmental scores between 0-100, 50 where data is missing
+    """
+    return region_environmental_scores(env_data_list)
+
+def calculate_investment_scores(env_data_list, poverty_indices, infrastructures):
     """
-    if "error" in env_data:
-        return 50.0  
-    ndvi_score = min(100, max(0, env_data.get("ndvi", 0) * 100))
+    Calculate the AI investment score of many regions in one vectorized pass.
     
-    precip = env_data.get("precipitation", 0)
-    if precip < 50:
-        precip_score = (precip / 50) * 100
-    elif precip > 200:
-        precip_score = max(0, 100 - ((precip - 200) / 100) * 50)
-    else:
-        precip_score = 100
+    Parameters:
+    env_data_list (List[Dict]): Environmental data dictionary of each region
+    poverty_indices (List[float]): Poverty index of each region, strings count as 50
+    infrastructures (List[str]): Green infrastructure of each region
     
-    sentinel = env_data.get("sentinel", -10)
-    if sentinel < -20:
-        soil_score = 0
-    elif sentinel > 0:
-        soil_score = 100
-    else:
-        soil_score = ((sentinel + 20) / 20) * 100
+    Returns:
+    np.ndarray: Investment scores
+    """
+    return region_investment_scores(env_data_list, poverty_indices, infrastructures, green_infra_costs)
+
+def calculate_environmental_score(env_data: Dict) -> float:
+    """
+    Calculate environmental score based on NDVI, precipitation, and soil moisture.
     
-    weights = {"ndvi": 0.5, "precipitation": 0.3, "soil": 0.2}
-    environmental_score = (
-        weights["ndvi"] * ndvi_score +
-        weights["precipitation"] * precip_score +
-        weights["soil"] * soil_score
-    )
+    Parameters:
+    env_data (Dict): Dictionary containing environmental metrics
     
-    return round(environmental_score, 1)
+    Returns:
+    float: Environmental score between 0-100
+    """
+    return environmental_score(env_data)
 
-def calculate_investment_score(env_data: Dict, poverty_index: float, infrastructure: str) -> Dict:
+def calculate_investment_score(env_data: Dict, poverty_index: float, infrastructure: str) -> float:
     """
     Calculate AI investment score based on environmental data, poverty index, and infrastructure costs.
     
@@ -384,37 +313,49 @@ def calculate_investment_score(env_data: Dict, poverty_index: float, infrastruct
     infrastructure (str): Type of green infrastructure
     
     Returns:
-    Dict: Dictionary containing scores and breakdown
+    float: Investment score
     """
-    if isinstance(poverty_index, str):
-        poverty_index = 50.0  
-    env_score = calculate_environmental_score(env_data)
-    
-    poverty_score = min(100, max(0, poverty_index))
-    
-    max_cost = max(green_infra_costs.values())
-    infra_cost = green_infra_costs.get(infrastructure, max_cost/2)
-    cost_factor = (1 - (infra_cost / max_cost)) * 100
-    
-    weights = {"environmental": 0.4, "poverty": 0.4, "cost": 0.2}
-    
-    investment_score = (
-        weights["environmental"] * env_score +
-        weights["poverty"] * poverty_score +
-        weights["cost"] * cost_factor
+    return investment_score(env_data, poverty_index, infrastructure, green_infra_costs)
+
+INSERT_INFRASTRUCTURE_QUERY = """
+    SELECT insert_infrastructure_data(
+        %(province)s,
+        %(infrastructure)s,
+        %(renewable_energy)s,
+        %(poverty_index)s,
+        %(ndvi)s,
+        %(precipitation)s,
+        %(sentinel)s,
+        %(no2)s,
+        %(co)s,
+        %(so2)s,
+        %(o3)s,
+        %(pm25)s,
+        %(ai_investment_score)s,
+        %(period)s
     )
-    
-    category = "Very Low"
-    if investment_score >= 80:
-        category = "Very High"
-    elif investment_score >= 65:
-        category = "High"
-    elif investment_score >= 50:
-        category = "Medium"
-    elif investment_score >= 35:
-        category = "Low"
-    
-    return round(investment_score, 1)
+"""
+
+def build_infrastructure_row(province, environmental_data, poverty_index, score, period):
+    """
+    Parameters for INSERT_INFRASTRUCTURE_QUERY, raises when a metric is missing.
+    """
+    return {
+        "province": province.title(),
+        "infrastructure": infra_results.get(province, "Not Available"),
+        "renewable_energy": renewable_results.get(province, "Not Available"),
+        "poverty_index": float(poverty_index),
+        "ndvi": float(environmental_data.get("ndvi")),
+        "precipitation": float(environmental_data.get("precipitation")),
+        "sentinel": float(environmental_data.get("sentinel")),
+        "no2": float(environmental_data.get("no2")),
+        "co": float(environmental_data.get("co")),
+        "so2": float(environmental_data.get("so2")),
+        "o3": float(environmental_data.get("o3")),
+        "pm25": float(environmental_data.get("pm25")),
+        "ai_investment_score": float(score),
+        "period": period
+    }
 
 @app.get("/get-infrastructure-detail/{province}")
 def get_infrastructure_detail(province: str):
@@ -424,153 +365,294 @@ def get_infrastructure_detail(province: str):
         if province not in province_coords:
             return {"error": "Invalid province name"}
         
+        news_ingestor.wait_ready()
         environmental_data = fetch_environmental_data(province)
         poverty_index = predict_poverty_index(province)
         infrastructure = infra_results.get(province, "Not Available")
-        renewable_energy = renewable_results.get(province, "Not Available")
 
-        investment_score = calculate_investment_score(
+        score = calculate_investment_score(
             environmental_data, 
             poverty_index if not isinstance(poverty_index, str) else 50.0,
             infrastructure
         )
         
-        data = {
-            "province": province.title(),
-            "infrastructure": infrastructure,
-            "renewable_energy": renewable_energy,
-            "poverty_index": float(poverty_index),
-            "ndvi": float(environmental_data.get("ndvi")),
-            "precipitation": float(environmental_data.get("precipitation")),
-            "sentinel": float(environmental_data.get("sentinel")),
-            "no2": float(environmental_data.get("no2")),
-            "co": float(environmental_data.get("co")),
-            "so2": float(environmental_data.get("so2")),
-            "o3": float(environmental_data.get("o3")),
-            "pm25": float(environmental_data.get("pm25")),
-            "ai_investment_score": float(investment_score),
-            "period": period
-        }
+        data = build_infrastructure_row(province, environmental_data, poverty_index, score, period)
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT insert_infrastructure_data(
-                    %(province)s,
-                    %(infrastructure)s,
-                    %(renewable_energy)s,
-                    %(poverty_index)s,
-                    %(ndvi)s,
-                    %(precipitation)s,
-                    %(sentinel)s,
-                    %(no2)s,
-                    %(co)s,
-                    %(so2)s,
-                    %(o3)s,
-                    %(pm25)s,
-                    %(ai_investment_score)s,
-                    %(period)s
-                )
-            """, data)
-            conn.commit()
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(INSERT_INFRASTRUCTURE_QUERY, data)
+                conn.commit()
         except Exception as ex:
             print("Error inserting data into Database:", ex)
         return "Success"
     except Exception as ex:
         return {"error": "An error occurred while processing the request :" + str(ex)}
 
+def cached_environmental_data(province):
+    metrics = cached_metrics(PROFILES["full"], province_coords[province])
+    return metrics if metrics is not None else {"error": "Earth Engine quota exceeded, try again later"}
+
+def fetch_all_province_data(regions):
+    """
+    Environmental data and poverty index of every region, batched where possible.
+
+    Regions found in the monthly aggregates or the metrics cache are not
+    computed again, the others are reduced with one batch request whose
+    results are cached like the ones of fetch_environmental_data.
+
+    Returns:
+    Tuple: Region to environmental data dict, region to poverty index
+    """
+    batch_error = prefetch_metrics(
+        PROFILES["full"], {coordinate_key(province_coords[region]): province_coords[region] for region in regions}
+    )
+    poverty_results = predict_all_poverty_indices(regions)
+
+    # After a quota error, one request per region would only hit the quota harder
+    fetch = cached_environmental_data if isinstance(batch_error, EarthEngineQuotaError) else fetch_environmental_data
+    environmental_results = {}
+    for region, result, error in run_for_regions(fetch, regions):
+        environmental_results[region] = result if error is None else {"error": str(error)}
+    return environmental_results, poverty_results
+
 @app.get("/all-environmental-scores")
 def get_all_environmental_scores():
-    results = {}
-    for province in province_coords.keys():
-        province = province.strip().lower()
-        
-        environmental_data = fetch_environmental_data(province)
-        poverty_index = predict_poverty_index(province)
-        infrastructure = infra_results.get(province, "Not Available")
-        
-        investment_data = calculate_investment_score(
-            environmental_data, 
-            poverty_index if not isinstance(poverty_index, str) else 50.0,
-            infrastructure
-        )
-        
-        results[province]= {
-            "province": province.title(),
-            "infrastructure": infrastructure,
-            "renewable_energy": renewable_results.get(province, "Not Available"),
-            "poverty_index": poverty_index,
-            **environmental_data,
-            "ai_investment_score": investment_data
-        }
-    return results
+    regions = list(province_coords.keys())
+    environmental_results, poverty_results = fetch_all_province_data(regions)
+    news_ingestor.wait_ready()
+
+    infrastructures = [infra_results.get(province, "Not Available") for province in regions]
+    scores = calculate_investment_scores(
+        [environmental_results[province] for province in regions],
+        [poverty_results[province] for province in regions],
+        infrastructures
+    )
 
-@app.get("/green-credit/")
-@app.get("/green-credit/{id_greencredit}")
-def get_green_credit(id_greencredit: Optional[int] = None):
-    query = "SELECT * FROM green_credit WHERE id = %s" if id_greencredit else "SELECT * FROM green_credit"
+    return {
+        province: province_record(province, environmental_results[province], poverty_results[province], score)
+        for province, score in zip(regions, scores)
+    }
+
+def province_record(province, environmental_data, poverty_index, score):
+    return {
+        "province": province.title(),
+        "infrastructure": infra_results.get(province, "Not Available"),
+        "renewable_energy": renewable_results.get(province, "Not Available"),
+        "poverty_index": poverty_index,
+        **environmental_data,
+        "ai_investment_score": float(score)
+    }
+
+def score_province(province):
+    news_ingestor.wait_ready()
+    environmental_data = fetch_environmental_data(province)
+    poverty_index = predict_poverty_index(province)
+    score = calculate_investment_score(
+        environmental_data, poverty_index, infra_results.get(province, "Not Available")
+    )
+    return province_record(province, environmental_data, poverty_index, score)
+
+def full_profile_record(region, environmental_data):
+    news_ingestor.wait_ready()
+    poverty_index = predict_poverty_index(region)
+    score = calculate_investment_score(
+        environmental_data, poverty_index, infra_results.get(region, "Not Available")
+    )
+    return province_record(region, environmental_data, poverty_index, score)
+
+# /regions/{group}/full scores any region group like /all-environmental-scores
+register_profile(MetricProfile(
+    "full", ENVIRONMENTAL_DATASETS, convert_environmental_values, full_profile_record,
+    cache_dataset="environmental", error_record=lambda e: {"error": "Failed to fetch environmental data"}, monthly=True
+))
+app.include_router(region_router)
+app.include_router(score_grid_router)
+
+@app.get("/all-environmental-scores/stream")
+def stream_all_environmental_scores(format: str = "ndjson"):
+    """
+    Same records as /all-environmental-scores, sent one region at a time as
+    NDJSON lines or Server-Sent Events (format=sse) as soon as each is scored.
+    """
+    def records():
+        for province, result, error in iter_for_regions(score_province, province_coords.keys()):
+            yield province, result if error is None else {"province": province.title(), "error": str(error)}
+    return stream_records(records(), format)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, (id_greencredit,) if id_greencredit else None)
-    rows = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    conn.close()
+class WeightScenario(BaseModel):
+    environmental: List[float] = list(ENVIRONMENTAL_WEIGHTS)
+    investment: List[float] = list(INVESTMENT_WEIGHTS)
 
-    result = []
-    for row in rows:
-        row_dict = {}
-        for key, value in zip(columns, row):
-            row_dict[key] = value
-        result.append(row_dict)
+class WhatIfRequest(BaseModel):
+    scenarios: List[WeightScenario]
 
-    return result
+MAX_WHAT_IF_SCENARIOS = 10000
+
+def fetch_latest_metrics():
+    query = """
+        SELECT DISTINCT ON (province) province, infrastructure, poverty_index, ndvi, precipitation, sentinel
+        FROM infrastructure
+        ORDER BY province, period DESC
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    return rows
+
+@app.post("/what-if-scores")
+def get_what_if_scores(request: WhatIfRequest):
+    """
+    Re-score every region under many weight scenarios using the last stored metrics.
+    
+    Each scenario holds the ndvi, precipitation and soil weights of the environmental
+    score and the environmental, poverty and cost weights of the investment score.
+    No Earth Engine request is made.
+    
+    Returns:
+    Dict: Region names, plus one row of scores and one row of ranks per scenario
+    """
+    scenarios = request.scenarios
+    if not scenarios or len(scenarios) > MAX_WHAT_IF_SCENARIOS:
+        return {"error": f"Provide between 1 and {MAX_WHAT_IF_SCENARIOS} scenarios"}
+    if any(len(scenario.environmental) != 3 or len(scenario.investment) != 3 for scenario in scenarios):
+        return {"error": "Each scenario needs 3 environmental and 3 investment weights"}
+
+    rows = fetch_latest_metrics()
+    if not rows:
+        return {"error": "No stored metrics available"}
+
+    def column(index, default):
+        return [default if row[index] is None else float(row[index]) for row in rows]
+
+    scores, ranks = weight_sweep(
+        column(3, 0), column(4, 0), column(5, -10), column(2, 50.0),
+        [green_infra_costs.get(row[1], max_infra_cost / 2) for row in rows],
+        max_infra_cost,
+        [scenario.environmental for scenario in scenarios],
+        [scenario.investment for scenario in scenarios]
+    )
+    return {
+        "regions": [row[0] for row in rows],
+        "scores": scores.tolist(),
+        "rankings": ranks.tolist()
+    }
+
+async def paginated(relation, args=(), fields=None, after_id=None, limit=DEFAULT_PAGE_SIZE, key_value=None):
+    """
+    One keyset page of relation ordered by id, serialized by Postgres.
+
+    fields is a comma separated column list. When the page is full the id to
+    pass as after_id for the next page is returned in the X-Next-After-Id header.
+    """
+    fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        body, count, last_id = await fetch_page_json(relation, args, fields, after_id, limit, key_value=key_value)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    headers = {"X-Next-After-Id": str(last_id)} if count == limit else None
+    return RawJSONResponse(body, headers=headers)
+
+@app.get("/green-credit/")
+@app.get("/green-credit/{id_greencredit}")
+async def get_green_credit(id_greencredit: Optional[int] = None, after_id: Optional[int] = None,
+                           limit: int = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+    return await paginated("green_credit", (), fields, after_id, limit, key_value=id_greencredit)
 
 @app.get("/green-bond/")
 @app.get("/green-bond/{id_greenbond}")
-def get_greenbond(id_greenbond: Optional[int] = None):
-    query = f"select*from get_green_bond_details({id_greenbond})"
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    conn.close()
-
-    result = []
-    for row in rows:
-        row_dict = {}
-        for key, value in zip(columns, row):
-            row_dict[key] = value
-        result.append(row_dict)
-
-    return result
+async def get_greenbond(id_greenbond: Optional[int] = None, after_id: Optional[int] = None,
+                        limit: int = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+    return await paginated("get_green_bond_details($1)", (id_greenbond,), fields, after_id, limit)
 
 @app.get("/get-infrastructure/{province}")
-def get_infrastructure(province: str):
-    query = "SELECT * FROM infrastructure WHERE province = %s"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, (province,))    
-    rows = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    conn.close()
-
-    result = []
-    for row in rows:
-        row_dict = {}
-        for key, value in zip(columns, row):
-            if key != 'period':
-                row_dict[key] = value
-        result.append(row_dict)
-
-    return result
+async def get_infrastructure(province: str):
+    return RawJSONResponse(await fetch_json(
+        "SELECT coalesce(json_agg(to_jsonb(infrastructure) - 'period'), '[]')::text FROM infrastructure WHERE province = $1",
+        province
+    ))
+
+def write_infrastructure_rows(rows, period):
+    """
+    Write the infrastructure rows of one period in a single transaction.
+
+    Rows already stored for the same provinces and period are replaced, so
+    running the job twice on the same day does not duplicate them. When the
+    batch fails the rows are retried one by one to report which ones failed,
+    a failed row leaves the stored row of its province in place.
+
+    Parameters:
+    rows (List): Outputs of build_infrastructure_row
+    period (str): Period of every row
+
+    Returns:
+    List: "Success" or an error dict for each row
+    """
+    if not rows:
+        return []
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SAVEPOINT bulk_insert")
+        try:
+            cur.execute(
+                "DELETE FROM infrastructure WHERE period = %s AND province = ANY(%s)",
+                (period, [row["province"] for row in rows])
+            )
+            execute_batch(cur, INSERT_INFRASTRUCTURE_QUERY, rows, page_size=len(rows))
+            outcomes = ["Success"] * len(rows)
+        except psycopg2.Error as ex:
+            print("Bulk insert failed, retrying row by row:", ex)
+            cur.execute("ROLLBACK TO SAVEPOINT bulk_insert")
+            outcomes = []
+            for row in rows:
+                cur.execute("SAVEPOINT insert_row")
+                try:
+                    cur.execute(
+                        "DELETE FROM infrastructure WHERE period = %s AND province = %s",
+                        (period, row["province"])
+                    )
+                    cur.execute(INSERT_INFRASTRUCTURE_QUERY, row)
+                    cur.execute("RELEASE SAVEPOINT insert_row")
+                    outcomes.append("Success")
+                except psycopg2.Error as row_ex:
+                    cur.execute("ROLLBACK TO SAVEPOINT insert_row")
+                    outcomes.append({"error": "Error inserting data into Database: " + str(row_ex)})
+        conn.commit()
+    return outcomes
 
 @app.get("/insert-infrastructure/")
 def insert_all_infrastructure():
+    period = datetime.now().strftime("%Y-%m-%d")
+    # Bulk job, interactive requests are served first
+    with priority(BATCH):
+        environmental_results, poverty_results = fetch_all_province_data(provinces)
+    news_ingestor.wait_ready()
+    poverty_indices = [
+        poverty_results[province] if not isinstance(poverty_results[province], str) else 50.0
+        for province in provinces
+    ]
+    scores = calculate_investment_scores(
+        [environmental_results[province] for province in provinces],
+        poverty_indices,
+        [infra_results.get(province, "Not Available") for province in provinces]
+    )
+
+    results = {}
+    rows = []
+    for province, score in zip(provinces, scores):
+        try:
+            rows.append(build_infrastructure_row(
+                province, environmental_results[province], poverty_results[province], score, period
+            ))
+        except Exception as ex:
+            results[province] = {"error": "An error occurred while processing the request :" + str(ex)}
+
     try:
-        for province in provinces:
-            get_infrastructure_detail(province)
+        outcomes = write_infrastructure_rows(rows, period)
     except Exception as ex:
-        print(f"Error : {ex} ")
\ No newline at end of file
+        print("Error inserting data into Database:", ex)
+        outcomes = [{"error": "Error inserting data into Database: " + str(ex)}] * len(rows)
+    for row, outcome in zip(rows, outcomes):
+        results[row["province"].lower()] = outcome
+    return {province: results[province] for province in provinces}
\ No newline at end of file
@@ -0,0 +1,166 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Separate from the psycopg2 pool in database.py, which keeps serving the
+# synchronous write paths
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", "1"))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "20"))
+# Connections idle for longer than this many seconds are closed by asyncpg
+ASYNC_DB_IDLE_LIFETIME = float(os.getenv("ASYNC_DB_IDLE_LIFETIME", "300"))
+
+async_pool = None
+async_pool_lock = asyncio.Lock()
+
+
+async def init_async_pool():
+    """
+    Create the asyncpg pool of the running event loop, once.
+
+    Returns:
+    asyncpg.Pool: The pool
+    """
+    global async_pool
+    async with async_pool_lock:
+        if async_pool is None:
+            async_pool = await asyncpg.create_pool(
+                database=os.getenv("DB_NAME"),
+                user=os.getenv("DB_USER"),
+                password=os.getenv("DB_PASSWORD"),
+                host=os.getenv("DB_HOST"),
+                port=os.getenv("DB_PORT"),
+                min_size=ASYNC_DB_POOL_MIN,
+                max_size=ASYNC_DB_POOL_MAX,
+                max_inactive_connection_lifetime=ASYNC_DB_IDLE_LIFETIME
+            )
+        return async_pool
+
+
+async def close_async_pool():
+    global async_pool
+    async with async_pool_lock:
+        if async_pool is not None:
+            await async_pool.close()
+            async_pool = None
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """
+    Borrow a connection from the asyncpg pool for the duration of an async with block.
+
+    Waiting for a free connection suspends the request instead of holding a
+    worker thread, asyncpg resets the connection when it is released.
+    """
+    connections = await init_async_pool()
+    async with connections.acquire() as conn:
+        yield conn
+
+
+# Page sizes of the keyset paginated endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+relation_columns_cache = {}
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+async def relation_columns(conn, relation):
+    """
+    Column names of a table or set returning function call, read once from
+    the prepared statement so no rows are fetched.
+    """
+    if relation not in relation_columns_cache:
+        statement = await conn.prepare(f"SELECT * FROM {relation} LIMIT 0")
+        relation_columns_cache[relation] = [attribute.name for attribute in statement.get_attributes()]
+    return relation_columns_cache[relation]
+
+
+async def page_query(conn, relation, args, fields, after_id, limit, key, key_value):
+    """
+    SQL and parameters of one keyset page, see fetch_page.
+    """
+    columns = await relation_columns(conn, relation)
+    unknown = [field for field in fields or [] if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if key not in columns:
+        raise ValueError(f"{relation} has no {key} column to paginate on")
+
+    selected = [key] + [field for field in fields or [] if field != key] if fields else columns
+    params = list(args)
+    conditions = []
+    for operator, value in (("=", key_value), (">", after_id)):
+        if value is not None:
+            params.append(value)
+            conditions.append(f"{quote_identifier(key)} {operator} ${len(params)}")
+    params.append(max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)))
+    query = f"SELECT {', '.join(quote_identifier(column) for column in selected)} FROM {relation} AS page"
+    if conditions:
+        query += f" WHERE {' AND '.join(conditions)}"
+    query += f" ORDER BY {quote_identifier(key)} LIMIT ${len(params)}"
+    return query, params
+
+
+async def fetch_page(relation, args=(), fields=None, after_id=None, limit=DEFAULT_PAGE_SIZE, key="id", key_value=None):
+    """
+    Fetch one page of rows ordered by key, starting after after_id.
+
+    Keyset pagination keeps every page an index range scan on key instead of
+    an OFFSET that rereads the skipped rows. The key column is always
+    returned so the caller can request the next page.
+
+    Parameters:
+    relation (str): Trusted table name or function call, e.g. "green_credit"
+    args (Tuple): Arguments of the $n placeholders in relation
+    fields (List[str]): Columns to return, all when empty
+    after_id (int): Return rows whose key is greater than this
+    limit (int): Page size, capped at MAX_PAGE_SIZE
+    key (str): Unique, indexed column the pages are ordered by
+    key_value (int): Only return the row with this key
+
+    Returns:
+    List: One dict per row, raises ValueError for unknown fields
+    """
+    async with async_db_connection() as conn:
+        query, params = await page_query(conn, relation, args, fields, after_id, limit, key, key_value)
+        rows = await conn.fetch(query, *params)
+    return [dict(row) for row in rows]
+
+
+async def fetch_page_json(relation, args=(), fields=None, after_id=None, limit=DEFAULT_PAGE_SIZE, key="id",
+                          key_value=None):
+    """
+    Same page as fetch_page, serialized to a JSON array by Postgres.
+
+    Rows never become Python objects: numerics keep their exact digits and
+    dates and timestamps are written in ISO 8601, like FastAPI would.
+
+    Returns:
+    Tuple: JSON bytes, number of rows and key of the last row
+    """
+    async with async_db_connection() as conn:
+        query, params = await page_query(conn, relation, args, fields, after_id, limit, key, key_value)
+        body, count, last_key = await conn.fetchrow(
+            f"SELECT coalesce(json_agg(rows ORDER BY rows.{quote_identifier(key)}), '[]')::text, count(*), "
+            f"max(rows.{quote_identifier(key)}) FROM ({query}) AS rows",
+            *params
+        )
+    return body.encode(), count, last_key
+
+
+async def fetch_json(query, *args):
+    """
+    Run a query returning a single JSON value and return it as bytes.
+    """
+    async with async_db_connection() as conn:
+        body = await conn.fetchval(query, *args)
+    return body.encode()
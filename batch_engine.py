@@ -0,0 +1,179 @@
+import ee
+from ee_scheduler import get_info
+from earth_engine import (
+    ENVIRONMENTAL_DATASETS, GEOSPATIAL_DATASETS, dataset_spec, environmental_composite,
+    convert_environmental_values, fetch_with_optional_fallback, geospatial_area, geospatial_composite
+)
+
+
+def regions_feature_collection(regions, area=None):
+    """
+    Turn a region -> (lat, lon) mapping into one FeatureCollection.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+    area (Callable): Optional function turning each point into the area to reduce
+
+    Returns:
+    ee.FeatureCollection: One feature per region with a "region" property
+    """
+    features = []
+    for region, (lat, lon) in regions.items():
+        point = ee.Geometry.Point(lon, lat)
+        features.append(ee.Feature(area(point) if area else point, {"region": region}))
+    return ee.FeatureCollection(features)
+
+
+def reduce_regions(image, collection, scale):
+    # forEachBand keeps the band names as output properties, even for single band images
+    return image.reduceRegions(
+        collection=collection,
+        reducer=ee.Reducer.mean().forEachBand(image),
+        scale=scale,
+        tileScale=4
+    )
+
+
+def properties_by_region(table):
+    return {feature["properties"]["region"]: feature["properties"] for feature in table["features"]}
+
+
+def dataset_groups(names):
+    """
+    Group datasets reduced together: same buffer, same scale, and optional
+    datasets apart so they can be dropped without touching the others.
+
+    Returns:
+    Dict: (buffer, scale, optional) to dataset names
+    """
+    groups = {}
+    for name in names:
+        spec = dataset_spec(name)
+        groups.setdefault((spec["buffer"], spec["scale"], bool(spec.get("optional"))), []).append(name)
+    return groups
+
+
+def fetch_dataset_tables(regions, names, group_image, description):
+    """
+    Reduce datasets around every region with a single getInfo() call.
+
+    Every group of dataset_groups is stacked into one image by group_image and
+    reduced with one reduceRegions table. When the request fails, it is
+    retried without the optional groups, see fetch_with_optional_fallback.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+    names (List[str]): Datasets to reduce
+    group_image (Callable): Builds the image of a group from (dataset names, ee.FeatureCollection)
+    description (str): Names the data in log messages
+
+    Returns:
+    List: (dataset names, region name to reduced properties) of every table
+    """
+    collections = {}
+    tables = {}
+    for (buffer, scale, _), group in dataset_groups(names).items():
+        if buffer not in collections:
+            area = (lambda point, radius=buffer: point.buffer(radius)) if buffer else None
+            collections[buffer] = regions_feature_collection(regions, area)
+        collection = collections[buffer]
+        tables["_".join(group)] = (group, reduce_regions(group_image(group, collection), collection, scale))
+
+    def fetch(names):
+        fetched = get_info(ee.Dictionary({
+            key: table for key, (group, table) in tables.items() if set(group) <= set(names)
+        }))
+        return [(tables[key][0], properties_by_region(table)) for key, table in fetched.items()]
+
+    return fetch_with_optional_fallback(fetch, list(names), description)
+
+
+def fetch_all_dataset_values(regions, start_date, end_date, names=None):
+    """
+    Reduce the datasets of every region with a single getInfo() call.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+    start_date (str): Start of the window (inclusive)
+    end_date (str): End of the window (exclusive)
+    names (List[str]): Datasets to reduce, all of ENVIRONMENTAL_DATASETS by default
+
+    Returns:
+    Dict: Region name to raw values shaped like fetch_environmental_values
+    """
+    def group_image(group, collection):
+        return ee.Image.cat([
+            environmental_composite(name, start_date, end_date, bounds=collection.geometry()) for name in group
+        ])
+
+    tables = fetch_dataset_tables(
+        regions, list(names or ENVIRONMENTAL_DATASETS), group_image, "batch environmental data"
+    )
+    values = {region: {} for region in regions}
+    for group, properties_of in tables:
+        for region, properties in properties_of.items():
+            for name in group:
+                band = dataset_spec(name)["band"]
+                if band in properties:
+                    values[region][name] = {band: properties[band]}
+    return values
+
+
+def fetch_all_environmental_data(regions, start_date, end_date):
+    """
+    Fetch the environmental data of every region with a single getInfo() call.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+    start_date (str): Start of the window (inclusive)
+    end_date (str): End of the window (exclusive)
+
+    Returns:
+    Dict: Region name to the same dict returned by fetch_environmental_data
+    """
+    values = fetch_all_dataset_values(regions, start_date, end_date)
+
+    results = {}
+    for region in regions:
+        try:
+            results[region] = convert_environmental_values(values[region])
+        except Exception as e:
+            print(f"Error fetching environmental data for {region}: {str(e)}")
+            results[region] = {"error": "Failed to fetch environmental data"}
+    return results
+
+
+def fetch_all_geospatial_data(regions):
+    """
+    Fetch the poverty model features of every region with a single getInfo() call.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+
+    Returns:
+    Dict: Region name to (night_lights, daylight_duration)
+    """
+    collection = regions_feature_collection(regions, geospatial_area)
+    fetched = get_info(ee.Dictionary({
+        name: reduce_regions(geospatial_composite(name), collection, spec["scale"])
+        for name, spec in GEOSPATIAL_DATASETS.items()
+    }))
+
+    values = {region: {} for region in regions}
+    for name, table in fetched.items():
+        band = GEOSPATIAL_DATASETS[name]["band"]
+        for region, properties in properties_by_region(table).items():
+            values[region][name] = properties.get(band)
+
+    results = {}
+    for region in regions:
+        night_lights = values[region].get("night_lights")
+        daylight_duration = values[region].get("daylight_duration")
+        if night_lights is None:
+            print(f"Warning: Night lights data unavailable for {region}")
+            night_lights = 0.0
+        if daylight_duration is None:
+            print(f"Warning: Daylight duration data unavailable for {region}")
+            daylight_duration = 0.0
+        results[region] = (float(night_lights), float(daylight_duration))
+    return results
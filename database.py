@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2 import pool
+
+load_dotenv()
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Connections idle for longer than this many seconds are checked before use
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_HEALTH_CHECK_INTERVAL", "30"))
+
+connection_pool = None
+pool_lock = threading.Lock()
+# psycopg2 pools raise when exhausted, borrowers wait on this instead
+pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+last_used = {}
+
+
+def init_pool():
+    """
+    Create the process-wide connection pool, once.
+
+    Returns:
+    ThreadedConnectionPool: The pool
+    """
+    global connection_pool
+    with pool_lock:
+        if connection_pool is None:
+            connection_pool = pool.ThreadedConnectionPool(
+                DB_POOL_MIN,
+                DB_POOL_MAX,
+                dbname=os.getenv("DB_NAME"),
+                user=os.getenv("DB_USER"),
+                password=os.getenv("DB_PASSWORD"),
+                host=os.getenv("DB_HOST"),
+                port=os.getenv("DB_PORT")
+            )
+        return connection_pool
+
+
+def close_pool():
+    global connection_pool
+    with pool_lock:
+        if connection_pool is not None:
+            connection_pool.closeall()
+            connection_pool = None
+            last_used.clear()
+
+
+def is_healthy(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - last_used.get(id(conn), time.monotonic()) < DB_HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def borrow(connections):
+    for _ in range(DB_POOL_MAX + 1):
+        conn = connections.getconn()
+        if is_healthy(conn):
+            return conn
+        last_used.pop(id(conn), None)
+        connections.putconn(conn, close=True)
+    raise psycopg2.OperationalError("No healthy database connection available")
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection for the duration of a with block.
+
+    The connection always goes back to the pool, uncommitted work is rolled
+    back and broken connections are discarded instead of reused.
+    """
+    connections = init_pool()
+    with pool_slots:
+        conn = borrow(connections)
+        try:
+            yield conn
+        finally:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            if conn.closed:
+                last_used.pop(id(conn), None)
+            else:
+                last_used[id(conn)] = time.monotonic()
+            connections.putconn(conn, close=bool(conn.closed))
@@ -0,0 +1,293 @@
+import ee
+import os
+from datetime import date
+
+from ee_scheduler import get_info, is_quota_error
+from lazy_init import LazyInitializer
+
+# Initialized on first use, see LazyInitializer
+earth_engine_session = LazyInitializer(
+    "Earth Engine", lambda: ee.Initialize(project=os.getenv("EE_PROJECT", "davidsiddiii"))
+)
+
+# Datasets reduced for every province. "buffer" is the radius (in meters) of the
+# area around the province point, None means the point itself is sampled.
+ENVIRONMENTAL_DATASETS = {
+    "ndvi": {
+        "collection": "MODIS/061/MOD13Q1",
+        "band": "NDVI",
+        "mask_positive": True,
+        "buffer": 10000,
+        "scale": 250
+    },
+    "precipitation": {
+        "collection": "UCSB-CHG/CHIRPS/DAILY",
+        "band": "precipitation",
+        "mask_positive": False,
+        "buffer": None,
+        "scale": 500
+    },
+    "sentinel": {
+        "collection": "COPERNICUS/S1_GRD",
+        "band": "VV",
+        "mask_positive": False,
+        "filter_bounds": True,
+        "buffer": None,
+        "scale": 500
+    },
+    "no2": {
+        "collection": "COPERNICUS/S5P/NRTI/L3_NO2",
+        "band": "NO2_column_number_density",
+        "mask_positive": True,
+        "buffer": 10000,
+        "scale": 1000
+    },
+    "co": {
+        "collection": "COPERNICUS/S5P/NRTI/L3_CO",
+        "band": "CO_column_number_density",
+        "mask_positive": True,
+        "buffer": 10000,
+        "scale": 1000
+    },
+    "so2": {
+        "collection": "COPERNICUS/S5P/NRTI/L3_SO2",
+        "band": "SO2_column_number_density",
+        "mask_positive": True,
+        "buffer": 10000,
+        "scale": 1000
+    },
+    "o3": {
+        "collection": "COPERNICUS/S5P/NRTI/L3_O3",
+        "band": "O3_column_number_density",
+        "mask_positive": True,
+        "buffer": 10000,
+        "scale": 1000
+    },
+    "aod": {
+        "collection": "MODIS/006/MCD19A2_GRANULES",
+        "band": "Optical_Depth_055",
+        "mask_positive": True,
+        "buffer": 10000,
+        "scale": 1000
+    },
+    # GEOS-CF is not always available, the AOD based estimate is used instead
+    "pm25": {
+        "collection": "NASA/GEOS-CF/v1/rpl/htf",
+        "band": "PM25",
+        "mask_positive": False,
+        "buffer": 10000,
+        "scale": 1000,
+        "optional": True
+    }
+}
+
+
+# Datasets only requested by some metric profiles of region_engine.py
+PROFILE_DATASETS = {
+    "lst": {
+        "collection": "MODIS/006/MOD11A1",
+        "band": "LST_Day_1km",
+        "mask_positive": False,
+        "buffer": 10000,
+        "scale": 1000
+    }
+}
+
+
+def dataset_spec(name):
+    return ENVIRONMENTAL_DATASETS.get(name) or PROFILE_DATASETS[name]
+
+
+def trailing_year_window():
+    """
+    The last 12 completed calendar months, the same window the monthly
+    aggregates cover, so live and aggregated metrics describe the same dates.
+
+    Returns:
+    Tuple: Start (inclusive) and end (exclusive) as 'YYYY-MM-DD'
+    """
+    end_date = date.today().replace(day=1)
+    start_date = end_date.replace(year=end_date.year - 1)
+    return start_date.isoformat(), end_date.isoformat()
+
+
+def environmental_collection(name, start_date, end_date, bounds=None):
+    """
+    Filtered and masked image collection of a dataset in ENVIRONMENTAL_DATASETS or PROFILE_DATASETS.
+
+    Parameters:
+    name (str): Dataset name
+    start_date (str): Start of the window (inclusive)
+    end_date (str): End of the window (exclusive)
+    bounds (ee.Geometry): Area used to pre-filter collections with filter_bounds
+
+    Returns:
+    ee.ImageCollection: Single band images
+    """
+    spec = dataset_spec(name)
+    collection = ee.ImageCollection(spec["collection"])
+    if spec.get("filter_bounds") and bounds is not None:
+        collection = collection.filterBounds(bounds)
+    collection = collection.filterDate(start_date, end_date).select(spec["band"])
+    if spec["mask_positive"]:
+        collection = collection.map(lambda img: img.updateMask(img.gt(0)))
+    return collection
+
+
+def environmental_composite(name, start_date, end_date, bounds=None):
+    """
+    Build the mean composite image of a dataset, see environmental_collection.
+
+    Returns:
+    ee.Image: Single band mean image
+    """
+    return environmental_collection(name, start_date, end_date, bounds).mean()
+
+
+def masked_band(band):
+    """
+    Fully masked single band image, stands in for the composite of an empty collection.
+    """
+    return ee.Image.constant(0).toFloat().rename(band).updateMask(ee.Image.constant(0))
+
+
+def band_or_masked(image, band):
+    """
+    Select band from image, or a fully masked band when image has none.
+
+    Reducing an empty collection, e.g. a dataset without images in the
+    window, gives an image without bands that rename() and reducers reject.
+    The masked band is added under the same name, so when image has the band
+    it is renamed with a suffix and select() keeps the original.
+    """
+    return image.addBands(masked_band(band)).select([band])
+
+
+def fetch_with_optional_fallback(fetch, names, description):
+    """
+    Run fetch(names), retrying without the optional datasets when it fails.
+
+    One failing optional dataset fails the whole request it is packed in, so
+    any error but a quota error, which a retry would only make worse, is
+    retried once with the required datasets only.
+
+    Parameters:
+    fetch (Callable): Fetches the given dataset names
+    names (List[str]): Datasets to fetch
+    description (str): Names the data in log messages
+
+    Returns:
+    Any: What fetch returned
+    """
+    try:
+        return fetch(names)
+    except Exception as e:
+        required = [name for name in names if not dataset_spec(name).get("optional")]
+        if len(required) == len(names) or is_quota_error(e):
+            raise
+        print(f"Retrying {description} without optional datasets:", str(e))
+        return fetch(required)
+
+
+def environmental_reductions(point, start_date, end_date, names=None):
+    reductions = {}
+    for name in names or ENVIRONMENTAL_DATASETS.keys():
+        spec = dataset_spec(name)
+        geometry = point.buffer(spec["buffer"]) if spec["buffer"] else point
+        reductions[name] = environmental_composite(name, start_date, end_date, bounds=point) \
+            .reduceRegion(reducer=ee.Reducer.mean(), geometry=geometry, scale=spec["scale"], bestEffort=True)
+    return reductions
+
+
+def fetch_environmental_values(point, start_date, end_date, single_request=True, names=None):
+    """
+    Reduce every environmental dataset, or only names, around a point.
+
+    Parameters:
+    point (ee.Geometry.Point): Location to sample
+    start_date (str): Start of the window (inclusive)
+    end_date (str): End of the window (exclusive)
+    single_request (bool): Pack all reductions into one ee.Dictionary and fetch
+        them with a single getInfo() instead of one round trip per dataset
+    names (List[str]): Datasets to reduce, all of ENVIRONMENTAL_DATASETS by default
+
+    Returns:
+    Dict: Raw reduceRegion output keyed by dataset name
+    """
+    reductions = environmental_reductions(point, start_date, end_date, names)
+
+    if not single_request:
+        values = {}
+        for name, reduction in reductions.items():
+            try:
+                values[name] = get_info(reduction)
+            except Exception as e:
+                if not dataset_spec(name).get("optional") or is_quota_error(e):
+                    raise
+        return values
+
+    return fetch_with_optional_fallback(
+        lambda names: get_info(ee.Dictionary({name: reductions[name] for name in names})),
+        list(reductions), "environmental data"
+    )
+
+
+def convert_environmental_values(values):
+    """
+    Convert raw reduceRegion output into the units returned by the API.
+
+    Parameters:
+    values (Dict): Output of fetch_environmental_values
+
+    Returns:
+    Dict: ndvi, precipitation, sentinel, no2, co, so2, o3 and pm25
+    """
+    def value(name, default=0):
+        return (values.get(name) or {}).get(ENVIRONMENTAL_DATASETS[name]["band"], default)
+
+    estimated_pm25 = value("aod") * 10
+    pm25_value = value("pm25", estimated_pm25)
+
+    return {
+        "ndvi": round(value("ndvi") * 0.0001, 2),
+        "precipitation": round(value("precipitation"), 1),
+        "sentinel": round(value("sentinel"), 3),
+        "no2": round(value("no2") * 1000000, 3),
+        "co": round(value("co") * 1000, 3),
+        "so2": round(value("so2") * 1000000, 3),
+        "o3": round(value("o3") / 2241.15, 3),
+        "pm25": round(pm25_value, 1)
+    }
+
+
+# Features of poverty_model.pkl. The model was trained on this fixed window so
+# it must not follow the current date.
+GEOSPATIAL_WINDOW_END = "2024-01-01"
+GEOSPATIAL_WINDOW_DAYS = 60
+
+GEOSPATIAL_DATASETS = {
+    "night_lights": {
+        "collection": "NOAA/VIIRS/DNB/MONTHLY_V1/VCMSLCFG",
+        "band": "avg_rad",
+        "scale": 500
+    },
+    "daylight_duration": {
+        "collection": "ECMWF/ERA5_LAND/MONTHLY",
+        "band": "surface_solar_radiation_downwards_sum",
+        "scale": 1000
+    }
+}
+
+
+def geospatial_area(point):
+    return point.buffer(5000).buffer(1000)
+
+
+def geospatial_composite(name):
+    spec = GEOSPATIAL_DATASETS[name]
+    end_date = ee.Date(GEOSPATIAL_WINDOW_END)
+    start_date = end_date.advance(-GEOSPATIAL_WINDOW_DAYS, "day")
+    return ee.ImageCollection(spec["collection"]) \
+        .filterDate(start_date, end_date) \
+        .select(spec["band"]) \
+        .mean()
@@ -0,0 +1,191 @@
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Requests per second and burst size of the token bucket
+EE_RATE = float(os.getenv("EE_RATE", "10"))
+EE_BURST = int(os.getenv("EE_BURST", "20"))
+# Earth Engine requests running at the same time, across every thread
+EE_MAX_CONCURRENT = int(os.getenv("EE_MAX_CONCURRENT", "8"))
+# Retries of a call failing with a quota error, waiting up to
+# EE_BACKOFF_BASE * 2 ** attempt seconds (capped at EE_BACKOFF_MAX) in between
+EE_MAX_RETRIES = int(os.getenv("EE_MAX_RETRIES", "5"))
+EE_BACKOFF_BASE = float(os.getenv("EE_BACKOFF_BASE", "1"))
+EE_BACKOFF_MAX = float(os.getenv("EE_BACKOFF_MAX", "32"))
+
+# Lower runs first
+INTERACTIVE = 0
+BATCH = 1
+
+current_priority = contextvars.ContextVar("ee_priority", default=INTERACTIVE)
+
+QUOTA_ERROR_PATTERN = re.compile(
+    r"\b429\b|quota|too many (?:concurrent|requests)|rate limit|resource.?exhausted", re.IGNORECASE
+)
+
+
+class EarthEngineQuotaError(Exception):
+    """
+    Raised when a call still hits the Earth Engine quota after every retry.
+    """
+
+
+def is_quota_error(e):
+    status = getattr(getattr(e, "resp", None), "status", None) or getattr(e, "status_code", None)
+    return str(status) == "429" or bool(QUOTA_ERROR_PATTERN.search(str(e)))
+
+
+@contextmanager
+def priority(level):
+    """
+    Run the Earth Engine calls of a with block at the given priority.
+
+    The priority is a context variable, so it follows the block into
+    run_for_regions workers but not into plain threads.
+    """
+    token = current_priority.set(level)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def take(self):
+        """
+        Take a token if one is available.
+
+        Returns:
+        float: 0 when a token was taken, otherwise seconds until the next one
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class EarthEngineScheduler:
+    """
+    Admits Earth Engine calls under a rate limit and a concurrency cap.
+
+    Waiting calls are admitted by priority, then in arrival order, so a bulk
+    job queued at BATCH priority never delays an interactive request by more
+    than the calls already running. Calls failing with a quota error are
+    retried with full-jitter exponential backoff, releasing their slot while
+    they wait.
+
+    Any callable can be scheduled, a fake client only needs to raise errors
+    that is_quota_error recognizes.
+    """
+
+    def __init__(self, rate=EE_RATE, burst=EE_BURST, max_concurrent=EE_MAX_CONCURRENT, max_retries=EE_MAX_RETRIES,
+                 backoff_base=EE_BACKOFF_BASE, backoff_max=EE_BACKOFF_MAX, clock=time.monotonic, sleep=time.sleep,
+                 jitter=random.random):
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.max_concurrent = max_concurrent
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.jitter = jitter
+        self.condition = threading.Condition()
+        self.queue = []
+        self.tickets = itertools.count()
+        self.active = 0
+        self.retries = 0
+
+    def acquire(self, level):
+        ticket = (level, next(self.tickets))
+        with self.condition:
+            heapq.heappush(self.queue, ticket)
+            try:
+                while True:
+                    timeout = None
+                    if self.queue[0] == ticket and self.active < self.max_concurrent:
+                        timeout = self.bucket.take()
+                        if not timeout:
+                            break
+                    self.condition.wait(timeout)
+            except BaseException:
+                self.queue.remove(ticket)
+                heapq.heapify(self.queue)
+                self.condition.notify_all()
+                raise
+            heapq.heappop(self.queue)
+            self.active += 1
+            self.condition.notify_all()
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def backoff(self, attempt):
+        return self.jitter() * min(self.backoff_max, self.backoff_base * 2 ** attempt)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) once admitted, at the priority of the caller.
+
+        Returns:
+        Any: The return value of func
+
+        Raises:
+        EarthEngineQuotaError: The quota was still exceeded after max_retries retries
+        """
+        level = current_priority.get()
+        for attempt in range(self.max_retries + 1):
+            self.acquire(level)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_quota_error(e):
+                    raise
+                error = e
+            finally:
+                self.release()
+
+            if attempt < self.max_retries:
+                delay = self.backoff(attempt)
+                with self.condition:
+                    self.retries += 1
+                print(f"Earth Engine quota exceeded, retrying in {delay:.1f}s:", str(error))
+                self.sleep(delay)
+        raise EarthEngineQuotaError(
+            f"Earth Engine quota exceeded after {self.max_retries + 1} attempts: {str(error)}"
+        ) from error
+
+    def stats(self):
+        with self.condition:
+            return {
+                "active": self.active,
+                "queued_interactive": sum(1 for level, _ in self.queue if level == INTERACTIVE),
+                "queued_batch": sum(1 for level, _ in self.queue if level != INTERACTIVE),
+                "retries": self.retries
+            }
+
+
+ee_scheduler = EarthEngineScheduler()
+
+
+def get_info(computed):
+    """
+    computed.getInfo() through the process-wide scheduler.
+    """
+    return ee_scheduler.call(computed.getInfo)
@@ -0,0 +1,70 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Maximum number of regions processed at the same time
+REGION_CONCURRENCY = int(os.getenv("REGION_CONCURRENCY", "8"))
+
+
+def run_for_regions(func, regions, max_workers=None):
+    """
+    Run func(region) for every region in parallel, at most max_workers at a time.
+
+    A failing region does not abort the batch, its exception is returned instead.
+    Workers run in a copy of the caller's context, so context variables such
+    as the Earth Engine priority carry over.
+
+    Parameters:
+    func (Callable): Function called with each region
+    regions (Iterable): Regions to process
+    max_workers (int): Concurrency cap, defaults to REGION_CONCURRENCY
+
+    Returns:
+    List: (region, result, error) tuples in the same order as regions
+    """
+    regions = list(regions)
+    if not regions:
+        return []
+
+    workers = max(1, min(max_workers or REGION_CONCURRENCY, len(regions)))
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, func, region) for region in regions]
+        for region, future in zip(regions, futures):
+            try:
+                outcomes.append((region, future.result(), None))
+            except Exception as e:
+                print(f"Error processing {region}: {str(e)}")
+                outcomes.append((region, None, e))
+    return outcomes
+
+
+def iter_for_regions(func, regions, max_workers=None):
+    """
+    Like run_for_regions, but yields each (region, result, error) as soon as it
+    is done instead of waiting for the whole batch.
+
+    Closing the generator early cancels the regions that have not started yet.
+
+    Returns:
+    Iterator: (region, result, error) tuples in completion order
+    """
+    regions = list(regions)
+    if not regions:
+        return
+
+    workers = max(1, min(max_workers or REGION_CONCURRENCY, len(regions)))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(contextvars.copy_context().run, func, region): region for region in regions}
+        for future in as_completed(futures):
+            region = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error processing {region}: {str(e)}")
+                yield region, None, e
+            else:
+                yield region, result, None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import numpy as np
+
+POVERTY_MODEL_PATH = "poverty_model.pkl"
+POVERTY_MODEL_ARRAYS_PATH = os.getenv("POVERTY_MODEL_ARRAYS_PATH", "poverty_model.npz")
+FOREST_FORMAT_VERSION = 1
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export_forest(model, path=POVERTY_MODEL_ARRAYS_PATH, source_path=POVERTY_MODEL_PATH):
+    """
+    Flatten a fitted RandomForestRegressor into contiguous node arrays.
+
+    The nodes of every tree are concatenated, children indices are made global
+    and leaves point to themselves so the evaluator can run a fixed number of
+    steps without branching on leaves.
+
+    Parameters:
+    model (RandomForestRegressor): Fitted single output forest
+    path (str): Output .npz file
+    source_path (str): Pickle the model was loaded from, its hash is stored so
+        a stale export is detected
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    if any(tree.n_outputs != 1 for tree in trees):
+        raise ValueError("Only single output forests are supported")
+
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    left, right, feature, threshold, value = [], [], [], [], []
+    for offset, tree in zip(offsets[:-1], trees):
+        nodes = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left == -1
+        left.append(np.where(is_leaf, nodes, tree.children_left + offset))
+        right.append(np.where(is_leaf, nodes, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        value.append(tree.value[:, 0, 0])
+
+    np.savez(
+        path,
+        format_version=np.int64(FOREST_FORMAT_VERSION),
+        source_sha256=np.array(file_sha256(source_path) if source_path else ""),
+        n_features=np.int64(model.n_features_in_),
+        max_depth=np.int64(max(tree.max_depth for tree in trees)),
+        roots=offsets[:-1].astype(np.int64),
+        left=np.concatenate(left).astype(np.int64),
+        right=np.concatenate(right).astype(np.int64),
+        feature=np.concatenate(feature).astype(np.int64),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        value=np.concatenate(value).astype(np.float64)
+    )
+
+
+class ForestEvaluator:
+    """
+    Pure NumPy evaluator of a forest exported by export_forest.
+
+    predict() matches RandomForestRegressor.predict: inputs are cast to float32
+    like sklearn does before comparing against the float64 thresholds, and the
+    tree outputs are averaged.
+    """
+
+    def __init__(self, arrays):
+        self.n_features = int(arrays["n_features"])
+        self.max_depth = int(arrays["max_depth"])
+        self.roots = arrays["roots"]
+        self.children = np.stack([arrays["left"], arrays["right"]], axis=1)
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an array of shape (n_samples, {self.n_features}), got {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        # nodes holds the current node of every (row, tree) pair
+        values = X.ravel()
+        row_offsets = (np.arange(X.shape[0]) * self.n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        for _ in range(self.max_depth):
+            goes_right = values[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[nodes, goes_right.astype(np.intp)]
+        return self.value[nodes].sum(axis=1) / self.roots.shape[0]
+
+
+def load_forest(path=POVERTY_MODEL_ARRAYS_PATH, source_path=POVERTY_MODEL_PATH):
+    """
+    Load an exported forest.
+
+    Returns:
+    ForestEvaluator: The evaluator, or None when the export is missing, in an
+    unknown format, or was made from a different pickle than source_path
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    if int(arrays["format_version"]) != FOREST_FORMAT_VERSION:
+        print(f"Ignoring {path}: unsupported format version")
+        return None
+    if source_path and os.path.exists(source_path) and str(arrays["source_sha256"]) != file_sha256(source_path):
+        print(f"Ignoring {path}: exported from a different {source_path}")
+        return None
+    return ForestEvaluator(arrays)
+
+
+if __name__ == "__main__":
+    import pickle
+
+    with open(POVERTY_MODEL_PATH, "rb") as f:
+        model = pickle.load(f)
+    export_forest(model)
+
+    evaluator = load_forest()
+    # Random rows plus rows sitting exactly on split thresholds, where float32 casting matters
+    rng = np.random.default_rng(0)
+    split = np.isfinite(evaluator.threshold)
+    edges = rng.uniform([0, 0], [30, 2e7], size=(split.sum(), model.n_features_in_))
+    edges[np.arange(split.sum()), evaluator.feature[split]] = evaluator.threshold[split]
+    samples = np.vstack([rng.uniform([0, 0], [30, 2e7], size=(10000, model.n_features_in_)), edges])
+    error = np.abs(evaluator.predict(samples) - model.predict(samples)).max()
+    print(f"Exported {len(model.estimators_)} trees to {POVERTY_MODEL_ARRAYS_PATH}, max abs difference {error:.3g}")
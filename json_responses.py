@@ -0,0 +1,15 @@
+from fastapi.responses import Response
+
+
+class RawJSONResponse(Response):
+    """
+    Response for bodies that are already JSON, e.g. built by Postgres.
+
+    The content is sent as is, skipping jsonable_encoder and json.dumps.
+    """
+    media_type = "application/json"
+
+    def render(self, content):
+        if isinstance(content, str):
+            return content.encode("utf-8")
+        return content
@@ -0,0 +1,48 @@
+import re
+
+
+class KeywordMatcher:
+    """
+    Finds which categories of a keyword mapping a text mentions, in one regex pass.
+
+    All keywords are compiled into a single alternation inside a lookahead so
+    a match is attempted at every position, longest keyword first. Any other
+    keyword starting at the same position is a prefix of the one that
+    matched, so the categories of those prefixes are counted with it and the
+    result equals checking every keyword with "in".
+    """
+
+    def __init__(self, mapping):
+        self.category_names = list(mapping)
+        keywords = {}
+        for category, category_keywords in mapping.items():
+            for keyword in category_keywords:
+                keywords.setdefault(keyword.lower(), set()).add(category)
+
+        # Categories of every keyword that occurs wherever keyword occurs
+        self.categories_of = {
+            keyword: set().union(*(categories for other, categories in keywords.items() if keyword.startswith(other)))
+            for keyword in keywords
+        }
+        alternation = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+        self.pattern = re.compile(f"(?=({alternation}))")
+
+    def categories(self, text):
+        found = set()
+        for match in self.pattern.finditer(text.lower()):
+            found |= self.categories_of[match.group(1)]
+        return found
+
+    def count(self, texts):
+        """
+        Classify many texts in one pass.
+
+        Returns:
+        Dict: Category to the number of texts mentioning it, every category of
+        the mapping is present
+        """
+        hits = dict.fromkeys(self.category_names, 0)
+        for text in texts:
+            for category in self.categories(text):
+                hits[category] += 1
+        return hits
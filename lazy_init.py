@@ -0,0 +1,39 @@
+import threading
+import time
+
+
+class LazyInitializer:
+    """
+    Runs an expensive setup function once, on first use, from any thread.
+
+    Concurrent callers wait for the same run instead of starting their own. A
+    setup that raises is not remembered, the next call tries again.
+    """
+
+    def __init__(self, name, setup):
+        self.name = name
+        self.setup = setup
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+        self.seconds = None
+
+    def get(self):
+        if self.loaded:
+            return self.value
+        with self.lock:
+            if not self.loaded:
+                start = time.perf_counter()
+                self.value = self.setup()
+                self.seconds = time.perf_counter() - start
+                self.loaded = True
+        return self.value
+
+    def warm(self):
+        """
+        Run the setup ahead of the first request, errors are only printed.
+        """
+        try:
+            self.get()
+        except Exception as e:
+            print(f"Error initializing {self.name}:", str(e))
@@ -0,0 +1,202 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from ee_scheduler import BATCH, priority
+from single_flight import SingleFlight
+
+# The temp dir stays writable on hosts where the working directory is read-only
+METRICS_CACHE_PATH = os.getenv("METRICS_CACHE_PATH", os.path.join(tempfile.gettempdir(), "metrics_cache.sqlite3"))
+METRICS_CACHE_SIZE = int(os.getenv("METRICS_CACHE_SIZE", "1024"))
+
+# Seconds an entry stays fresh, per dataset. "kind:name" datasets without
+# their own entry use the TTL of their kind, e.g. "raw:no2" the one of "raw".
+DATASET_TTLS = {
+    "environmental": 12 * 3600,
+    "geospatial": 30 * 24 * 3600,
+    "pollutant": 12 * 3600,
+    "solar": 12 * 3600,
+    "raw": 12 * 3600
+}
+DEFAULT_TTL = 3600
+
+# How long past its TTL an entry may still be served while it is refreshed
+MAX_STALE = int(os.getenv("METRICS_CACHE_MAX_STALE", str(7 * 24 * 3600)))
+
+
+def dataset_ttl(dataset):
+    if dataset in DATASET_TTLS:
+        return DATASET_TTLS[dataset]
+    return DATASET_TTLS.get(dataset.split(":", 1)[0], DEFAULT_TTL)
+
+
+def is_cacheable(value):
+    return not (isinstance(value, dict) and "error" in value)
+
+
+class MetricsCache:
+    """
+    Two-tier cache for Earth Engine metrics.
+
+    Entries are keyed by region, dataset and a day-aligned window. The first tier
+    is an in-process LRU, the second a SQLite file that survives restarts and is
+    shared by every worker on the host. Stale entries are returned immediately
+    while a background thread recomputes them, and concurrent misses of the
+    same entry share one computation.
+    """
+
+    def __init__(self, path=METRICS_CACHE_PATH, size=METRICS_CACHE_SIZE):
+        self.path = path
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.refreshing = set()
+        self.in_flight = SingleFlight()
+        try:
+            with self.connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS metrics (
+                        region TEXT NOT NULL,
+                        dataset TEXT NOT NULL,
+                        window_end TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        value TEXT NOT NULL,
+                        PRIMARY KEY (region, dataset, window_end)
+                    )
+                """)
+        except Exception as e:
+            print("Error initializing metrics cache:", str(e))
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def remember(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def load(self, region, dataset):
+        try:
+            with self.connect() as conn:
+                row = conn.execute("""
+                    SELECT window_end, created_at, value FROM metrics
+                    WHERE region = ? AND dataset = ?
+                    ORDER BY created_at DESC LIMIT 1
+                """, (region, dataset)).fetchone()
+        except Exception as e:
+            print("Error reading metrics cache:", str(e))
+            return None
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def store(self, region, dataset, window, value):
+        self.store_many([(region, dataset, window, value)])
+
+    def store_many(self, values):
+        """
+        Store several entries in one SQLite transaction.
+
+        Parameters:
+        values (List): (region, dataset, window, value) tuples
+        """
+        created_at = time.time()
+        for region, dataset, window, value in values:
+            self.remember((region, dataset), (window, created_at, value))
+        try:
+            with self.connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (region, dataset, window, created_at, json.dumps(value))
+                        for region, dataset, window, value in values
+                    ]
+                )
+                conn.executemany(
+                    "DELETE FROM metrics WHERE region = ? AND dataset = ? AND window_end != ?",
+                    [(region, dataset, window) for region, dataset, window, _ in values]
+                )
+        except Exception as e:
+            print("Error writing metrics cache:", str(e))
+
+    def lookup(self, region, dataset, window, ttl):
+        key = (region, dataset)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is not None and entry[0] == window and time.time() - entry[1] < ttl:
+            return entry
+
+        # Another worker may have refreshed the entry already
+        stored = self.load(region, dataset)
+        if stored is not None and (entry is None or stored[1] > entry[1]):
+            self.remember(key, stored)
+            entry = stored
+        return entry
+
+    def refresh(self, region, dataset, window, compute, cacheable):
+        try:
+            # Background refreshes yield to requests waiting for a value
+            with priority(BATCH):
+                value = compute()
+            if cacheable(value):
+                self.store(region, dataset, window, value)
+        except Exception as e:
+            print(f"Error refreshing {dataset} for {region}: {str(e)}")
+        finally:
+            with self.lock:
+                self.refreshing.discard((region, dataset, window))
+
+    def get_or_compute(self, region, dataset, window, compute, cacheable=is_cacheable):
+        """
+        Return the cached value of a metric, computing it when missing.
+
+        Parameters:
+        region (str): Region name
+        dataset (str): Dataset name, selects the TTL, see dataset_ttl
+        window (str): Day-aligned end of the aggregation window
+        compute (Callable): Computes the value, exceptions are propagated
+        cacheable (Callable): Decides if a computed value may be stored
+
+        Returns:
+        Any: JSON serializable metric value
+        """
+        ttl = dataset_ttl(dataset)
+        entry = self.lookup(region, dataset, window, ttl)
+        if entry is not None:
+            age = time.time() - entry[1]
+            if entry[0] == window and age < ttl:
+                return entry[2]
+            if age < ttl + MAX_STALE:
+                key = (region, dataset, window)
+                with self.lock:
+                    start = key not in self.refreshing
+                    self.refreshing.add(key)
+                if start:
+                    threading.Thread(
+                        target=self.refresh,
+                        args=(region, dataset, window, compute, cacheable),
+                        daemon=True
+                    ).start()
+                return entry[2]
+
+        return self.in_flight.do(
+            (region, dataset, window), lambda: self.compute(region, dataset, window, compute, cacheable)
+        )
+
+    def compute(self, region, dataset, window, compute, cacheable):
+        value = compute()
+        if cacheable(value):
+            self.store(region, dataset, window, value)
+        return value
+
+
+metrics_cache = MetricsCache()
@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import ee
+
+from batch_engine import fetch_dataset_tables
+from earth_engine import (
+    ENVIRONMENTAL_DATASETS, band_or_masked, dataset_spec, earth_engine_session, environmental_collection
+)
+from ee_scheduler import BATCH, priority
+from regions import coordinate_key
+
+# Per region, dataset and calendar month: the spatial mean of the per pixel
+# sum and count of valid observations. Adding the partials of the last
+# AGGREGATE_MONTHS months gives the trailing mean without reducing a whole
+# year again, so a refresh only reduces the month that just completed.
+MONTHLY_AGGREGATES_PATH = os.getenv("MONTHLY_AGGREGATES_PATH", "monthly_aggregates.sqlite3")
+AGGREGATE_MONTHS = 12
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def completed_months(today=None, months=AGGREGATE_MONTHS):
+    """
+    Returns:
+    List: First day ('YYYY-MM-DD') of the last months fully in the past, oldest first
+    """
+    current = month_start(today or date.today())
+    return [add_months(current, -offset).isoformat() for offset in range(months, 0, -1)]
+
+
+def fetch_monthly_aggregates(regions, month, names=None):
+    """
+    Reduce one calendar month of every dataset around every region with one
+    getInfo() call, each dataset contributing a <name>_sum and a <name>_count band.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+    month (str): First day of the month
+    names (List[str]): Datasets, all of ENVIRONMENTAL_DATASETS by default
+
+    Returns:
+    Dict: Region name to {dataset: (sum, count)}
+    """
+    earth_engine_session.get()
+    start_date = month
+    end_date = add_months(date.fromisoformat(month), 1).isoformat()
+
+    def group_image(group, collection):
+        bands = []
+        for name in group:
+            band = dataset_spec(name)["band"]
+            images = environmental_collection(name, start_date, end_date, collection.geometry())
+            # A month without images stores a zero count instead of failing the whole request
+            bands += [
+                band_or_masked(images.sum(), band).rename(f"{name}_sum"),
+                band_or_masked(images.count(), band).rename(f"{name}_count")
+            ]
+        return ee.Image.cat(bands)
+
+    tables = fetch_dataset_tables(
+        regions, list(names or ENVIRONMENTAL_DATASETS), group_image, "monthly aggregates"
+    )
+    aggregates = {region: {} for region in regions}
+    for group, properties_of in tables:
+        for region, properties in properties_of.items():
+            for name in group:
+                total, count = properties.get(f"{name}_sum"), properties.get(f"{name}_count")
+                aggregates[region][name] = (total or 0.0, count or 0.0)
+    return aggregates
+
+
+class MonthlyAggregateStore:
+    """
+    SQLite store of monthly partial aggregates, shared by every worker on the host.
+
+    Partials are stored per point (coordinate_key) rather than per region
+    name, so every endpoint and region group reading a point gets the same values.
+    """
+
+    def __init__(self, path=MONTHLY_AGGREGATES_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with self.connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS monthly_aggregates (
+                        region TEXT NOT NULL,
+                        dataset TEXT NOT NULL,
+                        month TEXT NOT NULL,
+                        total REAL NOT NULL,
+                        count REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (region, dataset, month)
+                    )
+                """)
+        except Exception as e:
+            print("Error initializing monthly aggregates:", str(e))
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def store(self, month, aggregates):
+        created_at = time.time()
+        with self.connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO monthly_aggregates VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (region, dataset, month, total, count, created_at)
+                    for region, datasets in aggregates.items() for dataset, (total, count) in datasets.items()
+                ]
+            )
+
+    def prune(self, oldest_month):
+        with self.connect() as conn:
+            conn.execute("DELETE FROM monthly_aggregates WHERE month < ?", (oldest_month,))
+
+    def missing_months(self, regions, months):
+        """
+        Returns:
+        List: Months for which at least one region has no aggregates
+        """
+        with self.connect() as conn:
+            stored = set(conn.execute(
+                f"SELECT DISTINCT region, month FROM monthly_aggregates WHERE month IN ({','.join('?' * len(months))})",
+                months
+            ).fetchall())
+        return [month for month in months if any((region, month) not in stored for region in regions)]
+
+    def trailing_values(self, region, months=None):
+        """
+        Trailing mean of every dataset of a region, from the stored partials.
+
+        Parameters:
+        region (str): coordinate_key of the region point
+        months (List[str]): Months of the window, the last completed year by default
+
+        Returns:
+        Dict: Raw values shaped like fetch_environmental_values, or None when a
+        month of the window is missing. Datasets without any observation are
+        left out, like reduceRegion leaves out fully masked bands.
+        """
+        months = months or completed_months()
+        try:
+            with self.connect() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT dataset, COUNT(*), SUM(total), SUM(count) FROM monthly_aggregates
+                    WHERE region = ? AND month IN ({','.join('?' * len(months))})
+                    GROUP BY dataset
+                    """,
+                    [region] + months
+                ).fetchall()
+        except Exception as e:
+            print("Error reading monthly aggregates:", str(e))
+            return None
+
+        complete = {dataset: (total, count) for dataset, stored_months, total, count in rows
+                    if stored_months == len(months)}
+        if any(name not in complete for name, spec in ENVIRONMENTAL_DATASETS.items() if not spec.get("optional")):
+            return None
+        return {
+            dataset: {dataset_spec(dataset)["band"]: total / count}
+            for dataset, (total, count) in complete.items() if count
+        }
+
+    def refresh(self, regions, today=None):
+        """
+        Reduce the months of the trailing window that are not stored yet,
+        usually only the month that just completed, and drop older months.
+        Runs at BATCH priority.
+
+        Parameters:
+        regions (Dict): Region name to (lat, lon), regions sharing a point are reduced once
+
+        Returns:
+        List: Months that were reduced
+        """
+        months = completed_months(today)
+        points = {coordinate_key(coords): coords for coords in regions.values()}
+        with self.lock, priority(BATCH):
+            missing = self.missing_months(points, months)
+            for month in missing:
+                self.store(month, fetch_monthly_aggregates(points, month))
+            self.prune(months[0])
+        return missing
+
+
+monthly_aggregates = MonthlyAggregateStore()
+
+
+if __name__ == "__main__":
+    from regions import all_region_points
+
+    points = all_region_points()
+    refreshed = monthly_aggregates.refresh(points)
+    print(f"Reduced {len(refreshed)} months for {len(points)} points: {', '.join(refreshed) or 'none'}")
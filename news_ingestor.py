@@ -0,0 +1,397 @@
+import fcntl
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from executor import run_for_regions
+from keyword_matcher import KeywordMatcher
+
+# Classified news of every region, written by the ingestor and read by every
+# worker so they all serve the same assignment. The temp dir stays writable on
+# hosts where the working directory is read-only.
+NEWS_SNAPSHOT_PATH = os.getenv("NEWS_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "news_snapshot.json"))
+NEWS_REFRESH_INTERVAL = int(os.getenv("NEWS_REFRESH_INTERVAL", str(6 * 3600)))
+# Seconds between checks of the snapshot file for a newer version
+NEWS_RELOAD_INTERVAL = int(os.getenv("NEWS_RELOAD_INTERVAL", "60"))
+NEWS_FETCH_TIMEOUT = 10
+NEWS_FETCH_CONCURRENCY = int(os.getenv("NEWS_FETCH_CONCURRENCY", "4"))
+# Longest a request waits for the first snapshot before serving without categories
+NEWS_READY_TIMEOUT = float(os.getenv("NEWS_READY_TIMEOUT", "30"))
+
+# Green infrastructure & renewable energy mappings
+green_infra_mapping = {
+    "Roof Garden": ["roof garden", "atap hijau"],
+    "Mangrove Reforestation": ["mangrove", "reforestasi"],
+    "Rain Water Harvesting": ["air hujan", "penampungan air"],
+    "Energy Efficient Building": ["hemat energi", "bangunan hijau"],
+    "Sustainable Transportation": ["transportasi berkelanjutan", "kendaraan listrik"],
+    "Biopore": ["biopori"],
+    "Ecotourism": ["ekowisata", "wisata hijau"],
+    "Urban Forest": ["hutan kota"],
+    "Green Wall": ["dinding hijau", "vertical garden"],
+    "Solar Panel": ["solar panel", "energi surya"],
+    "Green Wastewater Engineering": ["air limbah", "pengolahan limbah"],
+    "Green Corridor": ["jalur hijau", "jalan hijau"],
+    "Biofuel Plantations": ["biofuel", "energi biomassa"]
+}
+
+renewable_energy_mapping = {
+    "Solar Energy": ["solar", "energi surya", "panel surya"],
+    "Wind Energy": ["angin", "turbin angin"],
+    "Hydro Energy": ["hidro", "energi air", "pembangkit listrik tenaga air"],
+    "Geothermal": ["geotermal", "panas bumi"],
+    "Biomass": ["biomassa", "biofuel"]
+}
+
+# News sources
+news_sites = ["https://www.kompas.com/tag/infrastruktur-hijau", "https://www.detik.com/tag/infrastruktur-hijau"]
+energy_sites = ["https://www.kompas.com/tag/energi-terbarukan", "https://www.detik.com/tag/energi-terbarukan"]
+
+
+def parse_headlines(html):
+    # Only the ingesting worker pays for importing the parser
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    return [article.text.strip().lower() for article in soup.find_all('h2')]
+
+
+class NewsFetcher:
+    """
+    Fetches news pages concurrently over one keep-alive session.
+
+    Every page is revalidated with the ETag and Last-Modified of its previous
+    response, so an unchanged page costs a 304 and no download. Parsed
+    headlines are cached by the sha256 of the page body, a page whose
+    validators changed but whose content did not is not parsed again either.
+    """
+
+    def __init__(self, timeout=NEWS_FETCH_TIMEOUT, max_workers=NEWS_FETCH_CONCURRENCY, session=None):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = session
+        self.lock = threading.Lock()
+        self.validators = {}
+        self.headlines = {}
+        self.stats = {"downloaded": 0, "not_modified": 0, "parsed": 0}
+
+    def get_session(self):
+        with self.lock:
+            if self.session is None:
+                import requests
+
+                self.session = requests.Session()
+                self.session.headers["User-Agent"] = "Mozilla/5.0"
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+            return self.session
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def fetch_page(self, url):
+        """
+        Headlines of one page.
+
+        Returns:
+        List: Lowercased h2 texts, empty when the page did not answer 200 or 304
+        """
+        previous = self.validators.get(url)
+        headers = {}
+        if previous and previous["etag"]:
+            headers["If-None-Match"] = previous["etag"]
+        if previous and previous["last_modified"]:
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        response = self.get_session().get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and previous:
+            self.count("not_modified")
+            return self.headlines[previous["content_hash"]]
+        if response.status_code != 200:
+            print(f"Error scraping {url}: HTTP {response.status_code}")
+            return []
+
+        self.count("downloaded")
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        headlines = self.headlines.get(content_hash)
+        if headlines is None:
+            headlines = parse_headlines(response.text)
+            self.count("parsed")
+
+        with self.lock:
+            self.headlines[content_hash] = headlines
+            self.validators[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": content_hash
+            }
+            # Drop headlines no page refers to anymore
+            referenced = {validator["content_hash"] for validator in self.validators.values()}
+            for stale_hash in set(self.headlines) - referenced:
+                del self.headlines[stale_hash]
+        return headlines
+
+    def fetch(self, sites):
+        """
+        Fetch every site concurrently.
+
+        Returns:
+        Dict: Site to its headlines, sites that failed map to an empty list
+        """
+        pages = {}
+        for site, headlines, error in run_for_regions(self.fetch_page, sites, self.max_workers):
+            pages[site] = headlines if error is None else []
+        return pages
+
+
+news_fetcher = NewsFetcher()
+
+
+def scrape_news(sites, pages=None):
+    pages = pages if pages is not None else news_fetcher.fetch(sites)
+    articles = [headline for site in sites for headline in pages.get(site, [])]
+    return articles if articles else ["No relevant news found"]
+
+
+green_infra_matcher = KeywordMatcher(green_infra_mapping)
+renewable_energy_matcher = KeywordMatcher(renewable_energy_mapping)
+
+
+def assign_categories(regions, hits):
+    """
+    Draw a category for every region, weighted by how many headlines mention it.
+
+    Parameters:
+    regions (Iterable): Region names
+    hits (Dict): Category to headline count, from KeywordMatcher.count
+
+    Returns:
+    Dict: Region name to category, uniform over the categories when no
+    headline matched any of them
+    """
+    categories = list(hits)
+    weights = [hits[category] for category in categories]
+    if not any(weights):
+        weights = None
+    return {region: random.choices(categories, weights=weights)[0] for region in regions}
+
+
+def build_news_snapshot(regions, path=NEWS_SNAPSHOT_PATH):
+    """
+    Scrape the news sites, assign a green infrastructure and renewable energy
+    category to every region and write the result to path.
+
+    A snapshot that cannot be written is still returned, so the caller can
+    serve it from memory.
+
+    Parameters:
+    regions (Iterable): Region names
+    path (str): Output snapshot
+
+    Returns:
+    Dict: The snapshot
+    """
+    pages = news_fetcher.fetch(news_sites + energy_sites)
+    infra_hits = green_infra_matcher.count(scrape_news(news_sites, pages))
+    energy_hits = renewable_energy_matcher.count(scrape_news(energy_sites, pages))
+    snapshot = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "infrastructure": assign_categories(regions, infra_hits),
+        "renewable_energy": assign_categories(regions, energy_hits),
+        "infrastructure_hits": infra_hits,
+        "renewable_energy_hits": energy_hits
+    }
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print("Error writing news snapshot:", str(e))
+    return snapshot
+
+
+def load_news_snapshot(path=NEWS_SNAPSHOT_PATH):
+    """
+    Load the snapshot written by build_news_snapshot.
+
+    Returns:
+    Dict: The snapshot, None when it is missing or unreadable
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print("Error loading news snapshot:", str(e))
+        return None
+
+
+def snapshot_age(path=NEWS_SNAPSHOT_PATH):
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class NewsIngestor:
+    """
+    Keeps infra_results and renewable_results in sync with the news snapshot.
+
+    A daemon thread rebuilds the snapshot once it is older than
+    NEWS_REFRESH_INTERVAL. Workers on the same host race for a lock file, so
+    only one of them scrapes, and every worker reloads the file when its
+    modification time changes. A snapshot built by this worker is applied
+    right away, even when it could not be written. The result dicts are
+    updated in place, so modules holding a reference to them see the new
+    assignment.
+    """
+
+    def __init__(self, regions, path=NEWS_SNAPSHOT_PATH, refresh_interval=NEWS_REFRESH_INTERVAL,
+                 reload_interval=NEWS_RELOAD_INTERVAL):
+        self.regions = list(regions)
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.reload_interval = reload_interval
+        self.infra_results = {}
+        self.renewable_results = {}
+        self.loaded_mtime = None
+        self.built_at = None
+        self.build_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.build_thread = None
+        self.build_thread_lock = threading.Lock()
+
+    def apply(self, snapshot):
+        self.infra_results.update(snapshot.get("infrastructure", {}))
+        self.renewable_results.update(snapshot.get("renewable_energy", {}))
+        self.ready.set()
+
+    def wait_ready(self, timeout=NEWS_READY_TIMEOUT):
+        """
+        Wait until a snapshot was applied, for at most timeout seconds.
+
+        The first call finding no snapshot starts building one, for hosts
+        where the lifespan, and so the ingestor thread, never runs.
+
+        Returns:
+        bool: True when categories are available
+        """
+        if self.ready.is_set():
+            return True
+        if not self.reload():
+            self.build_now()
+        return self.ready.wait(timeout)
+
+    def age(self):
+        """
+        Seconds since the newest snapshot, on disk or built by this worker.
+        """
+        ages = [snapshot_age(self.path)]
+        if self.built_at is not None:
+            ages.append(time.monotonic() - self.built_at)
+        ages = [age for age in ages if age is not None]
+        return min(ages) if ages else None
+
+    def reload(self):
+        """
+        Apply the snapshot on disk if it changed since the last load.
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self.loaded_mtime:
+            return False
+        snapshot = load_news_snapshot(self.path)
+        if snapshot is None:
+            return False
+        self.apply(snapshot)
+        self.loaded_mtime = mtime
+        return True
+
+    def refresh(self):
+        """
+        Rebuild the snapshot when it is missing or older than refresh_interval,
+        unless another worker is already doing it.
+        """
+        if not self.build_lock.acquire(blocking=False):
+            return False
+        try:
+            age = self.age()
+            if age is not None and age < self.refresh_interval:
+                return False
+            try:
+                lock = open(self.path + ".lock", "w")
+            except OSError as e:
+                # No shared lock without a writable directory, build for this worker only
+                print("Error opening news snapshot lock:", str(e))
+                lock = None
+            try:
+                if lock is not None:
+                    try:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return False
+                    # Another worker may have finished while we waited for the lock
+                    age = snapshot_age(self.path)
+                    if age is not None and age < self.refresh_interval:
+                        return False
+                self.apply(build_news_snapshot(self.regions, self.path))
+                self.built_at = time.monotonic()
+            finally:
+                if lock is not None:
+                    lock.close()
+        finally:
+            self.build_lock.release()
+        return True
+
+    def build_now(self):
+        """
+        Build the first snapshot in the background when none could be loaded,
+        instead of waiting for the ingestor thread to start.
+        """
+        with self.build_thread_lock:
+            if self.ready.is_set() or (self.build_thread is not None and self.build_thread.is_alive()):
+                return
+            self.build_thread = threading.Thread(target=self.refresh_safely, name="news-snapshot", daemon=True)
+            self.build_thread.start()
+
+    def refresh_safely(self):
+        try:
+            self.refresh()
+            self.reload()
+        except Exception as e:
+            print("Error ingesting news:", str(e))
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.refresh_safely()
+            self.stop_event.wait(self.reload_interval)
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="news-ingestor", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    from regions import province_coords
+
+    built = build_news_snapshot(province_coords)
+    print(f"Wrote news categories of {len(built['infrastructure'])} regions to {NEWS_SNAPSHOT_PATH}")
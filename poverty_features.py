@@ -0,0 +1,76 @@
+import ee
+import json
+import os
+from datetime import datetime
+
+from batch_engine import fetch_all_geospatial_data
+from earth_engine import GEOSPATIAL_WINDOW_END, GEOSPATIAL_WINDOW_DAYS
+from ee_scheduler import BATCH, priority
+
+# Precomputed night lights and daylight duration per region. The features of
+# poverty_model.pkl use a fixed window, so they only change when the window or
+# the region list changes. Bump the version when the feature definition changes.
+POVERTY_FEATURES_PATH = os.getenv("POVERTY_FEATURES_PATH", "poverty_features.json")
+POVERTY_FEATURES_VERSION = 1
+
+
+def build_poverty_features(regions, path=POVERTY_FEATURES_PATH):
+    """
+    Compute the poverty model features of every region and write them to path.
+
+    Parameters:
+    regions (Dict): Region name to (lat, lon)
+    path (str): Output artifact
+
+    Returns:
+    Dict: Region name to [night_lights, daylight_duration]
+    """
+    with priority(BATCH):
+        features = {region: list(values) for region, values in fetch_all_geospatial_data(regions).items()}
+    artifact = {
+        "version": POVERTY_FEATURES_VERSION,
+        "window_end": GEOSPATIAL_WINDOW_END,
+        "window_days": GEOSPATIAL_WINDOW_DAYS,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "features": features
+    }
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(artifact, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return features
+
+
+def load_poverty_features(path=POVERTY_FEATURES_PATH):
+    """
+    Load the artifact written by build_poverty_features.
+
+    Returns:
+    Dict: Region name to (night_lights, daylight_duration), empty when the
+    artifact is missing or was built for another version or window
+    """
+    try:
+        with open(path) as f:
+            artifact = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print("Error loading poverty features:", str(e))
+        return {}
+
+    if artifact.get("version") != POVERTY_FEATURES_VERSION \
+            or artifact.get("window_end") != GEOSPATIAL_WINDOW_END \
+            or artifact.get("window_days") != GEOSPATIAL_WINDOW_DAYS:
+        print(f"Ignoring outdated poverty features in {path}")
+        return {}
+
+    return {region: (float(values[0]), float(values[1])) for region, values in artifact["features"].items()}
+
+
+if __name__ == "__main__":
+    from regions import province_coords
+
+    ee.Initialize(project=os.getenv("EE_PROJECT", "davidsiddiii"))
+    built = build_poverty_features(province_coords)
+    print(f"Wrote poverty features of {len(built)} regions to {POVERTY_FEATURES_PATH}")
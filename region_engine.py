@@ -0,0 +1,447 @@
+import ee
+import time
+from typing import Optional
+
+from fastapi import APIRouter
+
+from batch_engine import fetch_all_dataset_values
+from earth_engine import (
+    ENVIRONMENTAL_DATASETS, convert_environmental_values, dataset_spec, earth_engine_session,
+    fetch_environmental_values, trailing_year_window
+)
+from executor import iter_for_regions, run_for_regions
+from lazy_init import LazyInitializer
+from metrics_cache import MAX_STALE, dataset_ttl, metrics_cache
+from monthly_aggregates import monthly_aggregates
+from regions import REGION_GROUPS, coordinate_key
+from spatial_index import SpatialIndex
+from streaming import stream_records
+
+
+class MetricProfile:
+    """
+    What is measured around a region and how it is scored.
+
+    The datasets are reduced around the region point and convert() turns the
+    raw values into metrics. Raw values are cached per coordinate and dataset,
+    so profiles sharing a dataset reduce it once, and metrics are cached per
+    coordinate under cache_dataset, so every region sharing a point reuses
+    them. record()
+    turns the metrics of a region into its API record, error_record() builds
+    the record of a region whose metrics could not be computed. A monthly
+    profile reads its raw values from the stored monthly aggregates when
+    they cover the window, and only reduces them live otherwise.
+    """
+
+    def __init__(self, name, datasets, convert, record, cache_dataset=None, error_record=None, monthly=False):
+        self.name = name
+        self.datasets = list(datasets)
+        self.convert = convert
+        self.record = record
+        self.cache_dataset = cache_dataset or name
+        self.error_record = error_record or (lambda e: {"error": f"Failed to fetch environmental data: {str(e)}"})
+        self.monthly = monthly
+
+
+PROFILES = {}
+
+
+def register_profile(profile):
+    PROFILES[profile.name] = profile
+
+
+def band_value(values, name):
+    return (values.get(name) or {}).get(dataset_spec(name)["band"], 0)
+
+
+def environmental_rating(score):
+    if score >= 80:
+        return "Excellent"
+    elif score >= 60:
+        return "Good"
+    elif score >= 40:
+        return "Moderate"
+    elif score >= 20:
+        return "Poor"
+    return "Very Poor"
+
+
+def inverse_score(value, maximum):
+    # 0 pollutant value = 100 score, max pollutant value = 0 score
+    return max(0, 100 * (1 - (value / maximum)))
+
+
+def convert_pollutant_values(values):
+    return {
+        "no2": round(band_value(values, "no2") * 1000000, 3),  # μmol/m²
+        "co": round(band_value(values, "co") * 1000, 3),  # mol/m²
+        "so2": round(band_value(values, "so2") * 1000000, 3)  # μmol/m²
+    }
+
+
+def pollutant_record(region, metrics):
+    # Maximum expected values, equal weights for each pollutant
+    no2_score = inverse_score(metrics["no2"], 100.0)
+    co_score = inverse_score(metrics["co"], 60.0)
+    so2_score = inverse_score(metrics["so2"], 400.0)
+    env_score = round((no2_score + co_score + so2_score) / 3, 1)
+    return {
+        "environmental_score": env_score,
+        "environmental_rating": environmental_rating(env_score),
+        "pollutant_data": {
+            "no2": {"value": metrics["no2"], "unit": "μmol/m²", "score": round(no2_score, 1)},
+            "co": {"value": metrics["co"], "unit": "mol/m²", "score": round(co_score, 1)},
+            "so2": {"value": metrics["so2"], "unit": "μmol/m²", "score": round(so2_score, 1)}
+        }
+    }
+
+
+def convert_solar_values(values):
+    return {
+        "no2": round(band_value(values, "no2") * 1000000, 3),  # μmol/m²
+        "lst": round(band_value(values, "lst") * 0.02 - 273.15, 2)  # °C
+    }
+
+
+def solar_record(region, metrics):
+    no2_value, lst_value = metrics["no2"], metrics["lst"]
+    no2_score = inverse_score(no2_value, 100.0)
+    # Optimal temperature for solar panels is 25°C, 6.67 = 100/15 (15°C deviation from ideal)
+    lst_score = max(0, 100 - (abs(lst_value - 25) * 6.67))
+    env_score = round((0.3 * no2_score + 0.3 * lst_score), 1)
+
+    if lst_value > 35:
+        solar_panel_efficiency = "Reduced due to high temperatures"
+    elif no2_value > 60:
+        solar_panel_efficiency = "May be affected by air pollution deposits"
+    else:
+        solar_panel_efficiency = "Favorable conditions"
+
+    return {
+        "environmental_score": env_score,
+        "environmental_rating": environmental_rating(env_score),
+        "solar_panel_efficiency": solar_panel_efficiency,
+        "environmental_data": {
+            "no2": {
+                "value": no2_value,
+                "unit": "μmol/m²",
+                "score": round(no2_score, 1),
+                "impact": "Air pollution can reduce panel efficiency through particle deposition"
+            },
+            "lst": {
+                "value": lst_value,
+                "unit": "°C",
+                "score": round(lst_score, 1),
+                "impact": "Higher temperatures reduce solar panel efficiency by ~0.5% per °C above 25°C"
+            }
+        }
+    }
+
+
+def score_error_record(e):
+    return {
+        "error": f"Failed to fetch environmental data: {str(e)}",
+        "environmental_score": 0,
+        "environmental_rating": "Unknown"
+    }
+
+
+register_profile(MetricProfile(
+    "pollutant", ["no2", "co", "so2"], convert_pollutant_values, pollutant_record, error_record=score_error_record
+))
+register_profile(MetricProfile(
+    "solar", ["no2", "lst"], convert_solar_values, solar_record, error_record=score_error_record
+))
+# app.py registers its own "full" record with the poverty and investment scores
+register_profile(MetricProfile(
+    "full", ENVIRONMENTAL_DATASETS, convert_environmental_values, lambda region, metrics: dict(metrics),
+    cache_dataset="environmental", error_record=lambda e: {"error": "Failed to fetch environmental data"}, monthly=True
+))
+
+
+def raw_dataset(name):
+    return f"raw:{name}"
+
+
+def fresh_raw_values(key, names, end_date):
+    """
+    Raw values of the datasets cached fresh for a point.
+
+    Returns:
+    Dict: Dataset name to its raw reduceRegion output, datasets that have to
+    be reduced again are left out
+    """
+    values = {}
+    for name in names:
+        ttl = dataset_ttl(raw_dataset(name))
+        entry = metrics_cache.lookup(key, raw_dataset(name), end_date, ttl)
+        if entry is not None and entry[0] == end_date and time.time() - entry[1] < ttl:
+            values[name] = entry[2]
+    return values
+
+
+def store_raw_values(key, names, end_date, values):
+    """
+    Cache the raw values of the datasets reduced for a point.
+
+    Returns:
+    Dict: Dataset name to its raw value, for every name
+    """
+    # Datasets left out of the output were fully masked or optional and
+    # unavailable, caching them as empty keeps them from being reduced again
+    raw = {name: values.get(name) or {} for name in names}
+    metrics_cache.store_many([(key, raw_dataset(name), end_date, value) for name, value in raw.items()])
+    return raw
+
+
+def compute_point_metrics(profile, coords, start_date, end_date):
+    key = coordinate_key(coords)
+    values = fresh_raw_values(key, profile.datasets, end_date)
+    missing = [name for name in profile.datasets if name not in values]
+    if missing:
+        earth_engine_session.get()
+        lat, lon = coords
+        fetched = fetch_environmental_values(ee.Geometry.Point(lon, lat), start_date, end_date, names=missing)
+        values.update(store_raw_values(key, missing, end_date, fetched))
+    return profile.convert(values)
+
+
+def monthly_metrics(profile, key):
+    """
+    Metrics of a point derived from the monthly aggregates, None when the
+    profile is not monthly or the aggregates do not cover the window.
+    """
+    if not profile.monthly:
+        return None
+    values = monthly_aggregates.trailing_values(key)
+    return profile.convert(values) if values is not None else None
+
+
+def point_metrics(profile, coords):
+    metrics = monthly_metrics(profile, coordinate_key(coords))
+    if metrics is not None:
+        return metrics
+    start_date, end_date = trailing_year_window()
+    return metrics_cache.get_or_compute(
+        coordinate_key(coords), profile.cache_dataset, end_date,
+        lambda: compute_point_metrics(profile, coords, start_date, end_date)
+    )
+
+
+def cached_metrics(profile, coords):
+    """
+    Metrics of a point if the monthly aggregates or the cache have them,
+    without computing anything.
+
+    Returns:
+    Dict: The metrics, None when they would have to be computed
+    """
+    key = coordinate_key(coords)
+    metrics = monthly_metrics(profile, key)
+    if metrics is not None:
+        return metrics
+    _, end_date = trailing_year_window()
+    ttl = dataset_ttl(profile.cache_dataset)
+    entry = metrics_cache.lookup(key, profile.cache_dataset, end_date, ttl)
+    if entry is None or time.time() - entry[1] >= ttl + MAX_STALE:
+        return None
+    return entry[2]
+
+
+def prefetch_metrics(profile, points):
+    """
+    Compute the metrics of points that were never cached with one
+    reduceRegions request instead of one request per point. Only the
+    datasets without fresh raw values are reduced.
+
+    Parameters:
+    profile (MetricProfile): Profile to compute
+    points (Dict): Coordinate key to (lat, lon)
+
+    Returns:
+    Exception: Error of the batch request, None when it succeeded or was not needed
+    """
+    start_date, end_date = trailing_year_window()
+    ttl = dataset_ttl(profile.cache_dataset)
+    missing = [
+        key for key in points
+        if metrics_cache.lookup(key, profile.cache_dataset, end_date, ttl) is None
+        and monthly_metrics(profile, key) is None
+    ]
+    raw_values = {key: fresh_raw_values(key, profile.datasets, end_date) for key in missing}
+    names = [name for name in profile.datasets if any(name not in raw_values[key] for key in missing)]
+    fetch = {key: points[key] for key in missing if any(name not in raw_values[key] for name in names)}
+    if len(fetch) < 2:
+        return None
+
+    try:
+        earth_engine_session.get()
+        fetched = fetch_all_dataset_values(fetch, start_date, end_date, names)
+    except Exception as e:
+        print(f"Error fetching batch {profile.name} data:", str(e))
+        return e
+
+    entries = []
+    for key, values in raw_values.items():
+        if key in fetched:
+            values.update(store_raw_values(key, [name for name in names if name not in values], end_date, fetched[key]))
+        try:
+            entries.append((key, profile.cache_dataset, end_date, profile.convert(values)))
+        except Exception as e:
+            print(f"Error converting {profile.name} data for {key}: {str(e)}")
+    metrics_cache.store_many(entries)
+
+
+def region_record(profile, group, region, metrics=None, error=None):
+    if error is None:
+        try:
+            record = profile.record(region, metrics)
+        except Exception as e:
+            error = e
+    if error is not None:
+        print(f"Error scoring {region} with the {profile.name} profile: {str(error)}")
+        record = profile.error_record(error)
+    return {REGION_GROUPS[group]["label"]: region.title(), **record}
+
+
+def score_region(profile, group, region):
+    try:
+        metrics = point_metrics(profile, REGION_GROUPS[group]["regions"][region])
+    except Exception as e:
+        return region_record(profile, group, region, error=e)
+    return region_record(profile, group, region, metrics)
+
+
+def score_group(profile, group):
+    """
+    Score every region of a group.
+
+    Regions are grouped by coordinates first, each distinct point is computed
+    once and its metrics are shared by every region located there.
+
+    Returns:
+    Iterator: (region, record) pairs as soon as each point is done
+    """
+    regions_at = {}
+    points = {}
+    for region, coords in REGION_GROUPS[group]["regions"].items():
+        key = coordinate_key(coords)
+        regions_at.setdefault(key, []).append(region)
+        points[key] = coords
+
+    prefetch_metrics(profile, points)
+    for key, metrics, error in iter_for_regions(lambda key: point_metrics(profile, points[key]), points):
+        for region in regions_at[key]:
+            yield region, region_record(profile, group, region, metrics, error)
+
+
+# Nearest region lookups, one index over every group and one per group
+MAX_NEAREST = 20
+
+
+def build_region_index(groups):
+    return SpatialIndex(
+        ((group, region), coords) for group in groups for region, coords in REGION_GROUPS[group]["regions"].items()
+    )
+
+
+region_indexes = {
+    group: LazyInitializer(f"{group} index", lambda group=group: build_region_index([group])) for group in REGION_GROUPS
+}
+region_indexes[None] = LazyInitializer("region index", lambda: build_region_index(REGION_GROUPS))
+
+
+def nearest_regions(lat, lon, k=1, group=None):
+    """
+    Returns:
+    List: (group, region, (lat, lon), distance in km) of the k regions nearest to the point
+    """
+    return [
+        (group, region, coords, distance)
+        for (group, region), coords, distance in region_indexes[group].get().nearest(lat, lon, k)
+    ]
+
+
+def invalid_request(group, profile):
+    if group not in REGION_GROUPS:
+        return {"error": f"Invalid region group, expected one of {', '.join(REGION_GROUPS)}"}
+    if profile not in PROFILES:
+        return {"error": f"Invalid metric profile, expected one of {', '.join(PROFILES)}"}
+    return None
+
+
+router = APIRouter()
+
+
+@router.get("/regions")
+def list_region_groups():
+    return {
+        "groups": {group: list(spec["regions"]) for group, spec in REGION_GROUPS.items()},
+        "profiles": list(PROFILES)
+    }
+
+
+@router.get("/regions/{group}/{profile}")
+def get_group_scores(group: str, profile: str):
+    error = invalid_request(group, profile)
+    if error:
+        return error
+    records = dict(score_group(PROFILES[profile], group))
+    return {region: records[region] for region in REGION_GROUPS[group]["regions"]}
+
+
+# Sends each region as NDJSON or Server-Sent Events (format=sse) once it is scored
+@router.get("/regions/{group}/{profile}/stream")
+def stream_group_scores(group: str, profile: str, format: str = "ndjson"):
+    error = invalid_request(group, profile)
+    if error:
+        return error
+    return stream_records(score_group(PROFILES[profile], group), format)
+
+
+@router.get("/regions/{group}/{profile}/{region}")
+def get_region_score(group: str, profile: str, region: str):
+    error = invalid_request(group, profile)
+    if error:
+        return error
+    region = region.strip().lower()
+    if region not in REGION_GROUPS[group]["regions"]:
+        return {"error": "Invalid region name"}
+    return score_region(PROFILES[profile], group, region)
+
+
+@router.get("/score-at")
+def score_at(lat: float, lon: float, k: int = 1, group: Optional[str] = None, profile: Optional[str] = None):
+    """
+    Score of the k regions nearest to a coordinate, nearest first.
+
+    Every region is scored with profile, or with the default profile of its
+    group, reusing cached metrics when they exist.
+    """
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return {"error": "Coordinates out of range"}
+    if group is not None and group not in REGION_GROUPS:
+        return {"error": f"Invalid region group, expected one of {', '.join(REGION_GROUPS)}"}
+    if profile is not None and profile not in PROFILES:
+        return {"error": f"Invalid metric profile, expected one of {', '.join(PROFILES)}"}
+
+    nearest = nearest_regions(lat, lon, min(k, MAX_NEAREST), group)
+    scored = run_for_regions(
+        lambda match: score_region(PROFILES[profile or REGION_GROUPS[match[0]]["profile"]], match[0], match[1]),
+        nearest
+    )
+    return {
+        "lat": lat,
+        "lon": lon,
+        "results": [
+            {
+                "group": match_group,
+                "region": region,
+                "lat": coords[0],
+                "lon": coords[1],
+                "distance_km": round(distance, 3),
+                "score": record if error is None else {"error": str(error)}
+            }
+            for (match_group, region, coords, distance), record, error in scored
+        ]
+    }
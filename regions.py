@@ -0,0 +1,102 @@
+# Coordinates (lat, lon) of every province and regency served by the API
+province_coords = {
+    "aceh": (4.6951, 96.7494),
+    "sumatera utara": (2.1154, 99.5451),
+    "sumatera barat": (-0.7399, 100.8000),
+    "riau": (0.5071, 101.4478),
+    "jambi": (-1.4852, 102.4381),
+    "sumatera selatan": (-3.3194, 103.9144),
+    "bengkulu": (-3.7928, 102.2601),
+    "lampung": (-4.5586, 105.4068),
+    "bangka belitung": (-2.7410, 106.4406),
+    "kepulauan riau": (3.9457, 108.1429),
+    "dki jakarta": (-6.2088, 106.8456),
+    "jawa barat": (-6.8894, 107.6405),
+    "jawa tengah": (-7.1500, 110.1403),
+    "di yogyakarta": (-7.7956, 110.3695),
+    "jawa timur": (-7.2504, 112.7688),
+    "banten": (-6.4058, 106.0640),
+    "bali": (-8.3405, 115.0920),
+    "nusa tenggara barat": (-8.6529, 117.3616),
+    "nusa tenggara timur": (-8.6574, 121.0794),
+    "kalimantan barat": (0.1326, 111.0966),
+    "kalimantan tengah": (-1.6815, 113.3824),
+    "kalimantan selatan": (-3.0926, 115.2838),
+    "kalimantan timur": (1.6407, 116.4194),
+    "kalimantan utara": (3.5071, 117.4991),
+    "sulawesi utara": (1.4025, 124.9831),
+    "sulawesi tengah": (-1.4305, 120.7655),
+    "sulawesi selatan": (-3.6688, 119.9741),
+    "sulawesi tenggara": (-4.1461, 122.1743),
+    "gorontalo": (0.6994, 122.4467),
+    "sulawesi barat": (-2.8440, 119.2321),
+    "maluku": (-3.2385, 130.1453),
+    "maluku utara": (0.6348, 127.9721),
+    "papua": (-4.2699, 138.0804),
+    "papua barat": (-1.3361, 133.1747),
+    "papua selatan": (-7.6710, 138.7648),
+    "papua tengah": (-3.9917, 136.2804),
+    "papua pegunungan": (-4.5415, 138.1185),
+    "sidoarjo": (-7.4545375,112.5005207),
+    "bantul": (-7.902243,110.2863846),
+    "jakarta pusat": (-6.1822261,106.7952647)
+}
+
+# Subdistricts of Bantul regency
+bantul_subdistricts = {
+    "srandakan": (-7.9599944, 110.1975521),
+    "sanden": (-7.9811811, 110.1881439),
+    "kretek": (-7.9923989, 110.266404),
+    "pundong": (-7.9713209, 110.3009071),
+    "bambang lipuro": (-7.9445142, 110.2380219),
+    "pandak": (-7.924187, 110.243655),
+    "bantul": (-7.8913955, 110.295007),
+    "jetis": (-7.9098564, 110.3251626),
+    "imogiri": (-7.9375405, 110.3550834),
+    "dlingo": (-7.919252, 110.4111034),
+    "pleret": (-7.8773835, 110.3946772),
+    "piyungan": (-7.845006, 110.4297405),
+    "banguntapan": (-7.823617, 110.361653),
+    "sewon": (-7.8558584, 110.3108565),
+    "kasihan": (-7.8145279, 110.2754565),
+    "pajangan": (-7.8720351, 110.248431),
+    "sedayu": (-7.8239625, 110.2148165)
+}
+
+# Subdistricts of Jakarta Pusat
+jakarta_pusat_subdistricts = {
+    "gambir": (-6.1768, 106.8215),
+    "tanah abang": (-6.2053, 106.8179),
+    "menteng": (-6.1970, 106.8304),
+    "senen": (-6.1737, 106.8414),
+    "cempaka putih": (-6.1714, 106.8702),
+    "johar baru": (-6.1788, 106.8595),
+    "kemayoran": (-6.1619, 106.8494),
+    "sawah besar": (-6.1641, 106.8267)
+}
+
+def coordinate_key(coords):
+    """
+    Key of a region point, shared by every region located there.
+    """
+    lat, lon = coords
+    return f"{float(lat)},{float(lon)}"
+
+
+def all_region_points():
+    """
+    Returns:
+    Dict: Coordinate key to (lat, lon) of every region of every group
+    """
+    return {
+        coordinate_key(coords): coords for group in REGION_GROUPS.values() for coords in group["regions"].values()
+    }
+
+
+# Region groups served by region_engine.py, "label" is the key naming the
+# region in every record and "profile" the metric profile used by /score-at
+REGION_GROUPS = {
+    "provinces": {"label": "province", "profile": "full", "regions": province_coords},
+    "bantul": {"label": "subdistrict", "profile": "pollutant", "regions": bantul_subdistricts},
+    "jakarta-pusat": {"label": "subdistrict", "profile": "solar", "regions": jakarta_pusat_subdistricts}
+}
@@ -0,0 +1,332 @@
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import ee
+import numpy as np
+from fastapi import APIRouter
+
+from earth_engine import (
+    band_or_masked, dataset_spec, earth_engine_session, environmental_composite, fetch_with_optional_fallback,
+    masked_band, trailing_year_window
+)
+from ee_scheduler import BATCH, ee_scheduler, priority
+from executor import run_for_regions
+from lazy_init import LazyInitializer
+from scoring import environmental_scores
+
+# Regular latitude/longitude grid over Indonesia, built offline by running
+# this module and memory-mapped by the API. The .npy file holds a float32
+# (metric, row, column) array, the .json file describes it. Bump the version
+# when the layout or the metric definitions change.
+SCORE_GRID_PATH = os.getenv("SCORE_GRID_PATH", "score_grid")
+SCORE_GRID_VERSION = 1
+GRID_BOUNDS = {"west": 94.5, "south": -11.5, "east": 141.5, "north": 6.5}
+GRID_CELL_DEGREES = float(os.getenv("GRID_CELL_DEGREES", "0.05"))
+# Cells per side of the blocks requested from Earth Engine
+GRID_TILE_CELLS = 256
+
+GRID_DATASETS = ["ndvi", "precipitation", "sentinel", "no2", "co", "so2", "o3", "aod", "pm25"]
+GRID_METRICS = ["ndvi", "precipitation", "sentinel", "no2", "co", "so2", "o3", "pm25", "environmental_score"]
+# Masked pixels are sent with this value and stored as NaN
+NO_DATA = -9999.0
+# Largest map layer returned by /grid/layer, in cells
+MAX_LAYER_CELLS = 250000
+
+
+def grid_shape(bounds=GRID_BOUNDS, cell=GRID_CELL_DEGREES):
+    rows = int(np.ceil(round((bounds["north"] - bounds["south"]) / cell, 9)))
+    columns = int(np.ceil(round((bounds["east"] - bounds["west"]) / cell, 9)))
+    return rows, columns
+
+
+def convert_grid_values(raw):
+    """
+    Vectorized convert_environmental_values, without rounding and with NaN
+    where a dataset has no data.
+
+    Parameters:
+    raw (Dict): Dataset name to array of raw band values
+
+    Returns:
+    Dict: Metric name to array
+    """
+    def value(name):
+        values = np.asarray(raw[name], dtype=float)
+        return np.where(values == NO_DATA, np.nan, values)
+
+    pm25 = value("pm25")
+    converted = {
+        "ndvi": value("ndvi") * 0.0001,
+        "precipitation": value("precipitation"),
+        "sentinel": value("sentinel"),
+        "no2": value("no2") * 1000000,
+        "co": value("co") * 1000,
+        "so2": value("so2") * 1000000,
+        "o3": value("o3") / 2241.15,
+        "pm25": np.where(np.isnan(pm25), value("aod") * 10, pm25)
+    }
+    inputs = [converted["ndvi"], converted["precipitation"], converted["sentinel"]]
+    valid = ~np.any(np.isnan(inputs), axis=0)
+    scores = np.full(valid.shape, np.nan)
+    scores[valid] = environmental_scores(*(metric[valid] for metric in inputs))
+    converted["environmental_score"] = scores
+    return converted
+
+
+def grid_band(name, start_date, end_date, region, requested):
+    band = dataset_spec(name)["band"]
+    if name not in requested:
+        return masked_band(band).rename(name)
+    return band_or_masked(environmental_composite(name, start_date, end_date, bounds=region), band).rename(name)
+
+
+def grid_image(start_date, end_date, bounds, names=GRID_DATASETS):
+    """
+    One band per GRID_DATASETS entry, masked where a dataset has no data.
+    Datasets missing from names are masked instead of requested.
+    """
+    region = ee.Geometry.Rectangle([bounds["west"], bounds["south"], bounds["east"], bounds["north"]])
+    return ee.Image.cat([
+        grid_band(name, start_date, end_date, region, names) for name in GRID_DATASETS
+    ]).unmask(NO_DATA)
+
+
+def fetch_grid_tile(image, row, column, rows, columns, bounds, cell):
+    pixels = ee_scheduler.call(ee.data.computePixels, {
+        "expression": image,
+        "fileFormat": "NUMPY_NDARRAY",
+        "bandIds": GRID_DATASETS,
+        "grid": {
+            "dimensions": {"width": columns, "height": rows},
+            "affineTransform": {
+                "scaleX": cell, "shearX": 0, "translateX": bounds["west"] + column * cell,
+                "shearY": 0, "scaleY": -cell, "translateY": bounds["north"] - row * cell
+            },
+            "crsCode": "EPSG:4326"
+        }
+    })
+    return {name: pixels[name] for name in GRID_DATASETS}
+
+
+def build_score_grid(path=SCORE_GRID_PATH, bounds=GRID_BOUNDS, cell=GRID_CELL_DEGREES):
+    """
+    Evaluate the environmental composites on every grid cell and write the grid.
+
+    The grid is requested from Earth Engine in GRID_TILE_CELLS blocks, several
+    at a time at BATCH priority, each cell being the composite value at the
+    cell resolution.
+
+    Parameters:
+    path (str): Output path without extension
+    bounds (Dict): west, south, east and north of the grid in degrees
+    cell (float): Cell size in degrees
+
+    Returns:
+    Dict: The grid description written next to the array
+    """
+    earth_engine_session.get()
+    start_date, end_date = trailing_year_window()
+    images = {}
+
+    def image_of(names):
+        if tuple(names) not in images:
+            images[tuple(names)] = grid_image(start_date, end_date, bounds, names)
+        return images[tuple(names)]
+
+    def fetch_tile(tile):
+        return fetch_with_optional_fallback(
+            lambda names: fetch_grid_tile(image_of(names), *tile, bounds, cell), GRID_DATASETS, "grid tile"
+        )
+
+    rows, columns = grid_shape(bounds, cell)
+    grid = np.full((len(GRID_METRICS), rows, columns), np.nan, dtype=np.float32)
+
+    tiles = [
+        (row, column, min(GRID_TILE_CELLS, rows - row), min(GRID_TILE_CELLS, columns - column))
+        for row in range(0, rows, GRID_TILE_CELLS) for column in range(0, columns, GRID_TILE_CELLS)
+    ]
+    failed_tiles = 0
+    with priority(BATCH):
+        outcomes = run_for_regions(fetch_tile, tiles)
+    for (row, column, height, width), raw, error in outcomes:
+        if error is not None:
+            failed_tiles += 1
+            continue
+        converted = convert_grid_values(raw)
+        for index, metric in enumerate(GRID_METRICS):
+            grid[index, row:row + height, column:column + width] = converted[metric]
+
+    description = {
+        "version": SCORE_GRID_VERSION,
+        "bounds": bounds,
+        "cell_degrees": cell,
+        "shape": [rows, columns],
+        "metrics": GRID_METRICS,
+        "window_start": start_date,
+        "window_end": end_date,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "failed_tiles": failed_tiles
+    }
+
+    # np.save appends .npy to names without it
+    np.save(path + ".tmp.npy", grid)
+    os.replace(path + ".tmp.npy", path + ".npy")
+    with open(path + ".json.tmp", "w") as f:
+        json.dump(description, f, indent=2, sort_keys=True)
+    os.replace(path + ".json.tmp", path + ".json")
+    return description
+
+
+class ScoreGrid:
+    """
+    Read-only view of a grid written by build_score_grid.
+
+    The array is memory-mapped, so loading costs no I/O and every worker on
+    the host shares the same pages. A lookup is one index computation.
+    """
+
+    def __init__(self, description, values):
+        self.description = description
+        self.values = values
+        self.bounds = description["bounds"]
+        self.cell = description["cell_degrees"]
+        self.rows, self.columns = description["shape"]
+        self.metrics = description["metrics"]
+
+    def cell_at(self, lat, lon):
+        """
+        Returns:
+        Tuple: (row, column) of the cell containing the point, None outside the grid
+        """
+        row = int((self.bounds["north"] - lat) // self.cell)
+        column = int((lon - self.bounds["west"]) // self.cell)
+        if 0 <= row < self.rows and 0 <= column < self.columns:
+            return row, column
+        return None
+
+    def cell_center(self, row, column):
+        return (
+            self.bounds["north"] - (row + 0.5) * self.cell,
+            self.bounds["west"] + (column + 0.5) * self.cell
+        )
+
+    def values_at(self, row, column):
+        return {
+            metric: None if np.isnan(value) else round(float(value), 3)
+            for metric, value in zip(self.metrics, self.values[:, row, column])
+        }
+
+    def window(self, metric, west, south, east, north, step=1):
+        """
+        Cells of one metric inside a bounding box, every step-th cell.
+
+        Returns:
+        Tuple: Array of the values and (row, column) of its top left cell
+        """
+        top = max(0, int((self.bounds["north"] - north) // self.cell))
+        bottom = min(self.rows, int((self.bounds["north"] - south) // self.cell) + 1)
+        left = max(0, int((west - self.bounds["west"]) // self.cell))
+        right = min(self.columns, int((east - self.bounds["west"]) // self.cell) + 1)
+        index = self.metrics.index(metric)
+        return self.values[index, top:bottom:step, left:right:step], (top, left)
+
+
+def load_score_grid(path=SCORE_GRID_PATH):
+    """
+    Memory-map the grid written by build_score_grid.
+
+    Returns:
+    ScoreGrid: The grid, None when it is missing or was built for another version
+    """
+    try:
+        with open(path + ".json") as f:
+            description = json.load(f)
+        if description.get("version") != SCORE_GRID_VERSION:
+            print(f"Ignoring outdated score grid in {path}")
+            return None
+        values = np.load(path + ".npy", mmap_mode="r")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print("Error loading score grid:", str(e))
+        return None
+    if list(values.shape) != [len(description["metrics"])] + description["shape"]:
+        print(f"Ignoring score grid in {path}: shape does not match its description")
+        return None
+    return ScoreGrid(description, values)
+
+
+score_grid = LazyInitializer("score grid", load_score_grid)
+
+router = APIRouter()
+
+
+@router.get("/grid/at")
+def grid_at(lat: float, lon: float):
+    """
+    Precomputed metrics of the grid cell containing a coordinate.
+    """
+    # Also rejects NaN and infinity, which float query parameters accept
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return {"error": "Coordinates out of range"}
+    grid = score_grid.get()
+    if grid is None:
+        return {"error": "Score grid not available"}
+    cell = grid.cell_at(lat, lon)
+    if cell is None:
+        return {"error": "Coordinates outside the score grid"}
+    center_lat, center_lon = grid.cell_center(*cell)
+    return {
+        "row": cell[0],
+        "column": cell[1],
+        "cell_lat": round(center_lat, 6),
+        "cell_lon": round(center_lon, 6),
+        "window_end": grid.description["window_end"],
+        **grid.values_at(*cell)
+    }
+
+
+@router.get("/grid/layer")
+def grid_layer(metric: str = "environmental_score", west: Optional[float] = None, south: Optional[float] = None,
+               east: Optional[float] = None, north: Optional[float] = None, step: int = 1):
+    """
+    One metric over a bounding box for map layers, rows from north to south.
+    Missing cells are null. Use step to subsample large areas.
+    """
+    latitudes = [value for value in (south, north) if value is not None]
+    longitudes = [value for value in (west, east) if value is not None]
+    if not (all(-90 <= value <= 90 for value in latitudes) and all(-180 <= value <= 180 for value in longitudes)):
+        return {"error": "Coordinates out of range"}
+    grid = score_grid.get()
+    if grid is None:
+        return {"error": "Score grid not available"}
+    if metric not in grid.metrics:
+        return {"error": f"Invalid metric, expected one of {', '.join(grid.metrics)}"}
+
+    bounds = grid.bounds
+    west, south = bounds["west"] if west is None else west, bounds["south"] if south is None else south
+    east, north = bounds["east"] if east is None else east, bounds["north"] if north is None else north
+    step = max(1, step)
+    values, (top, left) = grid.window(metric, west, south, east, north, step)
+    if values.size > MAX_LAYER_CELLS:
+        return {"error": f"Layer too large ({values.size} cells), increase step"}
+
+    rounded = np.round(values.astype(float), 3)
+    north_edge = bounds["north"] - top * grid.cell
+    west_edge = bounds["west"] + left * grid.cell
+    return {
+        "metric": metric,
+        "north": round(north_edge, 6),
+        "west": round(west_edge, 6),
+        "cell_degrees": grid.cell * step,
+        "window_end": grid.description["window_end"],
+        "values": np.where(np.isnan(rounded), None, rounded).tolist()
+    }
+
+
+if __name__ == "__main__":
+    built = build_score_grid()
+    rows, columns = built["shape"]
+    print(f"Wrote {rows}x{columns} score grid to {SCORE_GRID_PATH}.npy, {built['failed_tiles']} failed tiles")
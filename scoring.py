@@ -0,0 +1,209 @@
+import numpy as np
+
+# Weights of (ndvi, precipitation, soil) and (environmental, poverty, cost)
+ENVIRONMENTAL_WEIGHTS = (0.5, 0.3, 0.2)
+INVESTMENT_WEIGHTS = (0.4, 0.4, 0.2)
+
+
+def round_scores(values, ndigits=1):
+    # np.round scales by 10**ndigits and can round ties differently than the
+    # builtin round used by the API so far, keep the builtin for identical output
+    return np.array([round(value, ndigits) for value in np.asarray(values, dtype=float).ravel().tolist()]) \
+        .reshape(np.shape(values))
+
+
+def environmental_components(ndvi, precipitation, sentinel):
+    """
+    Score NDVI, precipitation and Sentinel-1 VV of N regions on a 0-100 scale.
+
+    Parameters:
+    ndvi (np.ndarray): NDVI, 0-1
+    precipitation (np.ndarray): Mean daily precipitation, ideal range 50-200
+    sentinel (np.ndarray): VV backscatter in dB, typical range -20 to 0
+
+    Returns:
+    Tuple: ndvi, precipitation and soil moisture score arrays
+    """
+    ndvi = np.asarray(ndvi, dtype=float)
+    precipitation = np.asarray(precipitation, dtype=float)
+    sentinel = np.asarray(sentinel, dtype=float)
+
+    ndvi_score = np.fmin(100, np.fmax(0, ndvi * 100))
+    precipitation_score = np.where(
+        precipitation < 50,
+        (precipitation / 50) * 100,
+        np.where(precipitation > 200, np.fmax(0, 100 - ((precipitation - 200) / 100) * 50), 100.0)
+    )
+    soil_score = np.where(sentinel < -20, 0.0, np.where(sentinel > 0, 100.0, ((sentinel + 20) / 20) * 100))
+    return ndvi_score, precipitation_score, soil_score
+
+
+def environmental_scores(ndvi, precipitation, sentinel, weights=ENVIRONMENTAL_WEIGHTS):
+    """
+    Weighted environmental score of N regions, rounded like environmental_score.
+
+    Returns:
+    np.ndarray: Environmental scores between 0-100
+    """
+    ndvi_score, precipitation_score, soil_score = environmental_components(ndvi, precipitation, sentinel)
+    return round_scores(weights[0] * ndvi_score + weights[1] * precipitation_score + weights[2] * soil_score)
+
+
+def investment_scores(environmental_score, poverty_index, infra_cost, max_infra_cost, weights=INVESTMENT_WEIGHTS):
+    """
+    Weighted investment score of N regions, rounded like investment_score.
+
+    Parameters:
+    environmental_score (np.ndarray): Output of environmental_scores
+    poverty_index (np.ndarray): Poverty index, 0-100
+    infra_cost (np.ndarray): Cost of the green infrastructure of each region
+    max_infra_cost (float): Most expensive green infrastructure
+
+    Returns:
+    np.ndarray: Investment scores
+    """
+    environmental_score = np.asarray(environmental_score, dtype=float)
+    poverty_score = np.fmin(100, np.fmax(0, np.asarray(poverty_index, dtype=float)))
+    cost_factor = (1 - (np.asarray(infra_cost, dtype=float) / max_infra_cost)) * 100
+    return round_scores(weights[0] * environmental_score + weights[1] * poverty_score + weights[2] * cost_factor)
+
+
+def environmental_score(env_data):
+    """
+    Scalar environmental score of one region, the reference the vectorized
+    path must reproduce exactly.
+
+    Parameters:
+    env_data (Dict): Environmental data of the region
+
+    Returns:
+    float: Environmental score between 0-100, 50 when the data has an error
+    """
+    if "error" in env_data:
+        return 50.0
+    ndvi_score = min(100, max(0, env_data.get("ndvi", 0) * 100))
+
+    precip = env_data.get("precipitation", 0)
+    if precip < 50:
+        precip_score = (precip / 50) * 100
+    elif precip > 200:
+        precip_score = max(0, 100 - ((precip - 200) / 100) * 50)
+    else:
+        precip_score = 100
+
+    sentinel = env_data.get("sentinel", -10)
+    if sentinel < -20:
+        soil_score = 0
+    elif sentinel > 0:
+        soil_score = 100
+    else:
+        soil_score = ((sentinel + 20) / 20) * 100
+
+    weights = ENVIRONMENTAL_WEIGHTS
+    return round(weights[0] * ndvi_score + weights[1] * precip_score + weights[2] * soil_score, 1)
+
+
+def investment_score(env_data, poverty_index, infrastructure, infra_costs):
+    """
+    Scalar investment score of one region, the reference of region_investment_scores.
+
+    Parameters:
+    env_data (Dict): Environmental data of the region
+    poverty_index (float): Poverty index, strings count as 50
+    infrastructure (str): Green infrastructure of the region
+    infra_costs (Dict): Cost of every green infrastructure
+
+    Returns:
+    float: Investment score
+    """
+    if isinstance(poverty_index, str):
+        poverty_index = 50.0
+    env_score = environmental_score(env_data)
+    poverty_score = min(100, max(0, poverty_index))
+
+    max_cost = max(infra_costs.values())
+    infra_cost = infra_costs.get(infrastructure, max_cost / 2)
+    cost_factor = (1 - (infra_cost / max_cost)) * 100
+
+    weights = INVESTMENT_WEIGHTS
+    return round(weights[0] * env_score + weights[1] * poverty_score + weights[2] * cost_factor, 1)
+
+
+def region_environmental_scores(env_data_list):
+    """
+    Vectorized environmental_score of many regions.
+
+    Parameters:
+    env_data_list (List[Dict]): Environmental data of each region
+
+    Returns:
+    np.ndarray: Environmental scores between 0-100, 50 where the data has an error
+    """
+    valid = [i for i, env_data in enumerate(env_data_list) if "error" not in env_data]
+    scores = np.full(len(env_data_list), 50.0)
+    if valid:
+        scores[valid] = environmental_scores(
+            [env_data_list[i].get("ndvi", 0) for i in valid],
+            [env_data_list[i].get("precipitation", 0) for i in valid],
+            [env_data_list[i].get("sentinel", -10) for i in valid]
+        )
+    return scores
+
+
+def region_investment_scores(env_data_list, poverty_indices, infrastructures, infra_costs):
+    """
+    Vectorized investment_score of many regions.
+
+    Parameters:
+    env_data_list (List[Dict]): Environmental data of each region
+    poverty_indices (List[float]): Poverty index of each region, strings count as 50
+    infrastructures (List[str]): Green infrastructure of each region
+    infra_costs (Dict): Cost of every green infrastructure
+
+    Returns:
+    np.ndarray: Investment scores
+    """
+    max_cost = max(infra_costs.values())
+    poverty = [50.0 if isinstance(poverty_index, str) else poverty_index for poverty_index in poverty_indices]
+    costs = [infra_costs.get(infrastructure, max_cost / 2) for infrastructure in infrastructures]
+    return investment_scores(region_environmental_scores(env_data_list), poverty, costs, max_cost)
+
+
+def weight_sweep(ndvi, precipitation, sentinel, poverty_index, infra_cost, max_infra_cost,
+                 environmental_weights, investment_weights):
+    """
+    Re-score N regions under S weight scenarios in one pass.
+
+    Parameters:
+    ndvi, precipitation, sentinel, poverty_index, infra_cost (np.ndarray): Metrics of N regions
+    max_infra_cost (float): Most expensive green infrastructure
+    environmental_weights (np.ndarray): (S, 3) weights of ndvi, precipitation and soil
+    investment_weights (np.ndarray): (S, 3) weights of environmental, poverty and cost
+
+    Returns:
+    Tuple: (S, N) investment scores and (S, N) ranks, 1 being the highest score,
+    tied scores ranked in region order
+    """
+    ndvi_score, precipitation_score, soil_score = environmental_components(ndvi, precipitation, sentinel)
+    # Summed term by term like environmental_scores, a matrix product may round differently
+    environmental_weights = np.asarray(environmental_weights, dtype=float)
+    environmental_score = round_scores(
+        environmental_weights[:, 0:1] * ndvi_score
+        + environmental_weights[:, 1:2] * precipitation_score
+        + environmental_weights[:, 2:3] * soil_score
+    )
+
+    poverty_score = np.fmin(100, np.fmax(0, np.asarray(poverty_index, dtype=float)))
+    cost_factor = (1 - (np.asarray(infra_cost, dtype=float) / max_infra_cost)) * 100
+    investment_weights = np.asarray(investment_weights, dtype=float)
+    # Rounded like investment_scores, so the default scenario reproduces the live scores
+    scores = round_scores(
+        investment_weights[:, 0:1] * environmental_score
+        + investment_weights[:, 1:2] * poverty_score
+        + investment_weights[:, 2:3] * cost_factor
+    )
+
+    order = np.argsort(-scores, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[1] + 1)[None, :], axis=1)
+    return scores, ranks
@@ -0,0 +1,64 @@
+import threading
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that compute the same key.
+
+    The first caller of a key runs the function, callers arriving while it runs
+    wait for it and receive the same result or exception. The key is forgotten
+    as soon as the call finishes, later callers start a new one.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def do(self, key, func):
+        """
+        Parameters:
+        key (Hashable): Identifies the computation, e.g. (region, profile, window)
+        func (Callable): Computes the value, called at most once per flight
+
+        Returns:
+        Any: The value of func, shared by every caller of the same flight
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+            else:
+                flight.waiters += 1
+
+        if leader:
+            try:
+                flight.value = func()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self.lock:
+                    del self.flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def in_flight(self):
+        """
+        Returns:
+        Dict: Key to number of callers waiting on it, for every running flight
+        """
+        with self.lock:
+            return {key: flight.waiters for key, flight in self.flights.items()}
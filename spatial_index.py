@@ -0,0 +1,48 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class SpatialIndex:
+    """
+    Nearest neighbour index over (lat, lon) points.
+
+    Points are stored as unit vectors in a KD-tree. The straight-line distance
+    between unit vectors grows with the great-circle distance, so the tree
+    returns exactly the nearest points on the sphere, also across the
+    antimeridian, and the chord is converted back to kilometers.
+    """
+
+    def __init__(self, entries):
+        # Only imported when an index is built, so importing this module stays cheap
+        from scipy.spatial import cKDTree
+
+        entries = list(entries)
+        if not entries:
+            raise ValueError("SpatialIndex needs at least one point")
+        self.keys = [key for key, _ in entries]
+        self.coords = np.array([coords for _, coords in entries], dtype=float)
+        self.tree = cKDTree(unit_vectors(self.coords[:, 0], self.coords[:, 1]))
+
+    def nearest(self, lat, lon, k=1):
+        """
+        Parameters:
+        lat, lon (float): Query point in degrees
+        k (int): Number of neighbours
+
+        Returns:
+        List: (key, (lat, lon), distance in km) tuples, nearest first
+        """
+        k = max(1, min(k, len(self.keys)))
+        chords, indices = self.tree.query(unit_vectors(lat, lon), k=k)
+        chords, indices = np.atleast_1d(chords), np.atleast_1d(indices)
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chords / 2, 0, 1))
+        return [
+            (self.keys[i], tuple(self.coords[i]), float(distance)) for i, distance in zip(indices, distances)
+        ]
@@ -0,0 +1,52 @@
+import json
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Formats accepted by the streaming endpoints and their media types
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+
+def encode_records(records, stream_format="ndjson"):
+    """
+    Encode (region, record) pairs one at a time.
+
+    ndjson writes one JSON object per line. sse writes one "region" event per
+    record and a final "end" event so clients know the stream is complete.
+
+    Parameters:
+    records (Iterable): (region, record dict) pairs
+    stream_format (str): "ndjson" or "sse"
+
+    Returns:
+    Iterator: Encoded chunks
+    """
+    for region, record in records:
+        line = json.dumps({"region": region, **record}, default=str)
+        if stream_format == "sse":
+            yield f"event: region\ndata: {line}\n\n"
+        else:
+            yield line + "\n"
+    if stream_format == "sse":
+        yield "event: end\ndata: {}\n\n"
+
+
+def stream_records(records, stream_format="ndjson"):
+    """
+    StreamingResponse sending every record as soon as records yields it.
+
+    Returns:
+    StreamingResponse: The response, or a 400 JSON error for an unknown format
+    """
+    if stream_format not in STREAM_MEDIA_TYPES:
+        return JSONResponse(
+            {"error": f"Unknown format, expected one of {', '.join(STREAM_MEDIA_TYPES)}"}, status_code=400
+        )
+    return StreamingResponse(
+        encode_records(records, stream_format),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        # Stops proxies such as nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+
+from ee_scheduler import (
+    BATCH, INTERACTIVE, EarthEngineQuotaError, EarthEngineScheduler, TokenBucket, is_quota_error, priority
+)
+
+
+class FakeQuotaError(Exception):
+    def __init__(self):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+
+
+class FakeEarthEngine:
+    """
+    Local stand-in for Earth Engine: answers compute() calls, can be held
+    until released and fails the first quota_failures calls with a 429.
+    """
+
+    def __init__(self, quota_failures=0):
+        self.quota_failures = quota_failures
+        self.lock = threading.Lock()
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def compute(self, value):
+        with self.lock:
+            self.calls.append(value)
+            if len(self.calls) <= self.quota_failures:
+                raise FakeQuotaError()
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            self.release.wait(5)
+            return {"value": value}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def scheduler(**options):
+    options.setdefault("rate", 1000)
+    options.setdefault("burst", 1000)
+    return EarthEngineScheduler(**options)
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not reached")
+        time.sleep(0.001)
+
+
+def test_interactive_calls_are_admitted_before_queued_batch_calls():
+    client = FakeEarthEngine()
+    client.release.clear()
+    ee_scheduler = scheduler(max_concurrent=1)
+
+    def submit(level, value):
+        with priority(level):
+            ee_scheduler.call(client.compute, value)
+
+    # Occupies the only slot until released
+    threads = [threading.Thread(target=submit, args=(BATCH, "running"))]
+    threads[0].start()
+    wait_until(lambda: client.calls == ["running"])
+
+    for index, (level, value) in enumerate([(BATCH, "b1"), (BATCH, "b2"), (INTERACTIVE, "i1"), (INTERACTIVE, "i2")]):
+        thread = threading.Thread(target=submit, args=(level, value))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: sum(ee_scheduler.stats()[key] for key in ("queued_interactive", "queued_batch")) == index + 1)
+
+    client.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert client.calls == ["running", "i1", "i2", "b1", "b2"]
+
+
+def test_concurrent_calls_are_capped():
+    client = FakeEarthEngine()
+    client.release.clear()
+    ee_scheduler = scheduler(max_concurrent=3)
+    threads = [threading.Thread(target=ee_scheduler.call, args=(client.compute, value)) for value in range(10)]
+    for thread in threads:
+        thread.start()
+
+    wait_until(lambda: client.running == 3 and ee_scheduler.stats()["queued_interactive"] == 7)
+    assert ee_scheduler.stats()["active"] == 3
+
+    client.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(client.calls) == 10
+    assert client.max_running == 3
+    assert ee_scheduler.stats()["active"] == 0
+
+
+def test_quota_errors_back_off_exponentially_then_raise():
+    client = FakeEarthEngine(quota_failures=100)
+    delays = []
+    ee_scheduler = scheduler(max_retries=4, backoff_base=1, backoff_max=5, sleep=delays.append, jitter=lambda: 1.0)
+
+    with pytest.raises(EarthEngineQuotaError) as raised:
+        ee_scheduler.call(client.compute, "value")
+
+    assert delays == [1, 2, 4, 5]
+    assert len(client.calls) == 5
+    assert isinstance(raised.value.__cause__, FakeQuotaError)
+    assert ee_scheduler.stats()["retries"] == 4
+
+
+def test_backoff_is_jittered_and_recovers():
+    client = FakeEarthEngine(quota_failures=2)
+    delays = []
+    ee_scheduler = scheduler(backoff_base=2, sleep=delays.append, jitter=lambda: 0.25)
+
+    assert ee_scheduler.call(client.compute, "value") == {"value": "value"}
+    assert delays == [0.5, 1.0]
+
+
+def test_other_errors_pass_through_without_retry():
+    delays = []
+    ee_scheduler = scheduler(sleep=delays.append)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("Image.rename: bad band count")
+
+    with pytest.raises(ValueError):
+        ee_scheduler.call(fail)
+    assert calls == [1]
+    assert delays == []
+    assert ee_scheduler.stats() == {"active": 0, "queued_interactive": 0, "queued_batch": 0, "retries": 0}
+
+
+@pytest.mark.parametrize("error, expected", [
+    (FakeQuotaError(), True),
+    (Exception("Earth Engine memory quota exceeded"), True),
+    (Exception("Too many concurrent aggregations"), True),
+    (Exception("User memory limit exceeded"), False),
+    (Exception("Image.load: Image asset not found"), False)
+])
+def test_is_quota_error(error, expected):
+    assert is_quota_error(error) == expected
+
+
+def test_token_bucket_refills_at_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.5)
+    now[0] += 0.5
+    assert bucket.take() == 0
+    # Refills up to the capacity only
+    now[0] += 10
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() > 0
@@ -0,0 +1,97 @@
+import os
+import pickle
+import shutil
+import warnings
+
+import numpy as np
+import pytest
+
+from forest_inference import ForestEvaluator, load_forest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "poverty_model.pkl")
+ARRAYS_PATH = os.path.join(ROOT, "poverty_model.npz")
+
+# The pickle was fitted on a DataFrame, the evaluator only takes arrays
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+
+
+@pytest.fixture(scope="module")
+def model():
+    pytest.importorskip("sklearn")
+    with open(MODEL_PATH, "rb") as f, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    return load_forest(ARRAYS_PATH, MODEL_PATH)
+
+
+def threshold_rows(evaluator, rng):
+    """
+    Rows with one feature exactly on a split threshold, and on the float32
+    values just below and above it, everything else random.
+    """
+    split = np.isfinite(evaluator.threshold)
+    features = evaluator.feature[split]
+    thresholds = evaluator.threshold[split].astype(np.float32)
+    rows = []
+    for values in (np.nextafter(thresholds, np.float32(-np.inf)), thresholds, np.nextafter(thresholds, np.float32(np.inf))):
+        edges = rng.uniform([0, 0], [30, 2e7], size=(len(values), evaluator.n_features))
+        edges[np.arange(len(values)), features] = values
+        rows.append(edges)
+    # The float64 thresholds themselves, cast to float32 by the evaluator
+    edges = rng.uniform([0, 0], [30, 2e7], size=(split.sum(), evaluator.n_features))
+    edges[np.arange(split.sum()), features] = evaluator.threshold[split]
+    rows.append(edges)
+    return np.vstack(rows)
+
+
+def test_committed_export_matches_pickle(model, evaluator):
+    assert isinstance(evaluator, ForestEvaluator)
+    assert evaluator.n_features == model.n_features_in_
+    assert evaluator.roots.shape[0] == len(model.estimators_)
+
+    rng = np.random.default_rng(0)
+    random_rows = rng.uniform([0, 0], [30, 2e7], size=(5000, evaluator.n_features))
+    assert np.allclose(evaluator.predict(random_rows), model.predict(random_rows))
+
+    edges = threshold_rows(evaluator, rng)
+    assert np.allclose(evaluator.predict(edges), model.predict(edges))
+
+
+def test_single_row_prediction(model, evaluator):
+    row = [[12.5, 4.2e6]]
+    assert np.allclose(evaluator.predict(row), model.predict(row))
+
+
+def test_invalid_input_is_rejected(evaluator):
+    with pytest.raises(ValueError):
+        evaluator.predict([[1.0, 2.0, 3.0]])
+    with pytest.raises(ValueError):
+        evaluator.predict([[np.nan, 2.0]])
+
+
+def test_export_of_another_pickle_is_ignored(tmp_path):
+    arrays_path = tmp_path / "poverty_model.npz"
+    source_path = tmp_path / "poverty_model.pkl"
+    shutil.copy(ARRAYS_PATH, arrays_path)
+    shutil.copy(MODEL_PATH, source_path)
+    assert isinstance(load_forest(str(arrays_path), str(source_path)), ForestEvaluator)
+
+    with open(source_path, "ab") as f:
+        f.write(b"retrained")
+    assert load_forest(str(arrays_path), str(source_path)) is None
+
+
+def test_missing_or_unknown_export_is_ignored(tmp_path):
+    assert load_forest(str(tmp_path / "missing.npz"), MODEL_PATH) is None
+
+    with np.load(ARRAYS_PATH) as data:
+        arrays = {key: data[key] for key in data.files}
+    arrays["format_version"] = np.int64(0)
+    arrays_path = tmp_path / "poverty_model.npz"
+    np.savez(arrays_path, **arrays)
+    assert load_forest(str(arrays_path), MODEL_PATH) is None
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from keyword_matcher import KeywordMatcher
+from news_ingestor import green_infra_mapping, renewable_energy_mapping
+
+FILLER = ["pemkot", "jakarta", "baru", "dan", "untuk", "the", "di", "kota", "air", "energi", "solar", "hijau"]
+
+
+def nested_scan(title, mapping):
+    # The scan KeywordMatcher replaced: every keyword checked with "in"
+    title_lower = title.lower()
+    return {
+        category for category, keywords in mapping.items()
+        if any(keyword.lower() in title_lower for keyword in keywords)
+    }
+
+
+def random_titles(mapping, count, seed=0):
+    """
+    Titles made of keywords, keyword fragments and filler, with random casing
+    and sometimes no separator, so keywords overlap and prefix each other.
+    """
+    rng = random.Random(seed)
+    keywords = [keyword for category_keywords in mapping.values() for keyword in category_keywords]
+    words = sorted({word for keyword in keywords for word in keyword.split()})
+
+    def piece():
+        kind = rng.random()
+        if kind < 0.3:
+            text = rng.choice(keywords)
+        elif kind < 0.6:
+            text = rng.choice(words)
+        elif kind < 0.8:
+            word = rng.choice(keywords)
+            start = rng.randrange(len(word))
+            text = word[start:rng.randrange(start, len(word)) + 1]
+        else:
+            text = rng.choice(FILLER)
+        return text.upper() if rng.random() < 0.1 else text
+
+    return [
+        "".join(piece() + rng.choice([" ", " ", "", "-", ": "]) for _ in range(rng.randint(1, 8)))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("mapping", [green_infra_mapping, renewable_energy_mapping], ids=["green_infra", "renewable"])
+def test_categories_match_nested_scan(mapping):
+    matcher = KeywordMatcher(mapping)
+    titles = random_titles(mapping, 20000)
+    mismatches = [title for title in titles if matcher.categories(title) != nested_scan(title, mapping)]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("mapping", [green_infra_mapping, renewable_energy_mapping], ids=["green_infra", "renewable"])
+def test_count_matches_nested_scan(mapping):
+    titles = random_titles(mapping, 2000, seed=1) + ["", "No relevant news found"]
+    expected = dict.fromkeys(mapping, 0)
+    for title in titles:
+        for category in nested_scan(title, mapping):
+            expected[category] += 1
+    assert KeywordMatcher(mapping).count(titles) == expected
+
+
+def test_keyword_prefixes_and_overlaps():
+    mapping = {"short": ["solar"], "long": ["solar panel"], "overlap": ["panel surya"], "other": ["angin"]}
+    matcher = KeywordMatcher(mapping)
+    assert matcher.categories("Solar Panel Surya") == {"short", "long", "overlap"}
+    assert matcher.categories("solarpanel") == {"short"}
+    assert matcher.categories("tidak ada") == set()
+    assert list(matcher.count([])) == ["short", "long", "overlap", "other"]
@@ -0,0 +1,83 @@
+import pytest
+
+import news_ingestor
+from Benchmarks.news_fetcher_benchmark import stub_server
+from news_ingestor import NewsFetcher
+
+
+@pytest.fixture
+def stub():
+    server, revisions = stub_server(pages=2, delay=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server, revisions, [f"{base}{path}" for path in revisions]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def parsed_pages(monkeypatch):
+    pages = []
+    parse_headlines = news_ingestor.parse_headlines
+
+    def counting_parse(html):
+        pages.append(html)
+        return parse_headlines(html)
+
+    monkeypatch.setattr(news_ingestor, "parse_headlines", counting_parse)
+    return pages
+
+
+def fetch_delta(fetcher, sites):
+    before = dict(fetcher.stats)
+    pages = fetcher.fetch(sites)
+    return pages, {key: fetcher.stats[key] - before[key] for key in before}
+
+
+def test_not_modified_returns_cached_headlines_without_parsing(stub, parsed_pages):
+    _, _, sites = stub
+    fetcher = NewsFetcher()
+    first, delta = fetch_delta(fetcher, sites)
+    assert delta == {"downloaded": 2, "not_modified": 0, "parsed": 2}
+    assert all(len(headlines) == 3 for headlines in first.values())
+    assert "pemkot bangun hutan kota baru di /tag/0" in first[sites[0]]
+
+    second, delta = fetch_delta(fetcher, sites)
+    assert delta == {"downloaded": 0, "not_modified": 2, "parsed": 0}
+    assert second == first
+    assert len(parsed_pages) == 2
+
+
+def test_changed_body_is_parsed_again(stub, parsed_pages):
+    _, revisions, sites = stub
+    fetcher = NewsFetcher()
+    first, _ = fetch_delta(fetcher, sites)
+
+    revisions["/tag/0"] += 1
+    second, delta = fetch_delta(fetcher, sites)
+    assert delta == {"downloaded": 1, "not_modified": 1, "parsed": 1}
+    assert "revisi 2: mangrove dan reforestasi pesisir" in second[sites[0]]
+    assert second[sites[1]] == first[sites[1]]
+    assert len(parsed_pages) == 3
+
+
+def test_new_etag_with_same_body_hits_content_hash_cache(stub, parsed_pages):
+    server, _, sites = stub
+    fetcher = NewsFetcher()
+    first, _ = fetch_delta(fetcher, sites)
+
+    server.etag_salt = "redeployed"
+    second, delta = fetch_delta(fetcher, sites)
+    assert delta == {"downloaded": 2, "not_modified": 0, "parsed": 0}
+    assert second == first
+    assert len(parsed_pages) == 2
+
+    # The new validators are remembered
+    _, delta = fetch_delta(fetcher, sites)
+    assert delta == {"downloaded": 0, "not_modified": 2, "parsed": 0}
+
+
+def test_missing_page_maps_to_no_headlines(stub):
+    _, _, sites = stub
+    missing = sites[0].replace("/tag/0", "/tag/missing")
+    pages = NewsFetcher().fetch([missing])
+    assert pages == {missing: []}
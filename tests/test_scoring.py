@@ -0,0 +1,139 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from scoring import (
+    ENVIRONMENTAL_WEIGHTS, INVESTMENT_WEIGHTS, environmental_score, investment_score, region_environmental_scores,
+    region_investment_scores, weight_sweep
+)
+
+# Same shape as green_infra_costs in app.py, importing app would need Earth Engine
+INFRA_COSTS = {
+    "Roof Garden": 5.2,
+    "Mangrove Reforestation": 8.7,
+    "Penampungan Air Hujan": 3.4,
+    "Bangunan Hemat Energi": 12.5,
+    "Transportasi Berkelanjutan": 15.3,
+    "Biopori": 1.8,
+    "Ekowisata": 7.6,
+    "Hutan Kota": 9.2,
+    "Dinding Hijau": 4.5,
+    "Solar Panel": 10.8,
+    "Rekayasa Air Limbah Hijau": 6.9,
+    "Jalur Hijau": 5.5,
+    "Biofuel Plantations": 11.3
+}
+INFRASTRUCTURES = list(INFRA_COSTS) + ["Not Available"]
+
+NDVI = [-0.5, 0, 0.001, 0.25, 0.333, 0.5, 0.999, 1, 1.5]
+PRECIPITATION = [-10, 0, 25, 49.999, 50, 50.001, 125, 199.999, 200, 200.001, 300, 400, 1000]
+SENTINEL = [-40, -20.001, -20, -19.999, -10, -0.001, 0, 0.001, 5]
+
+
+def boundary_env_data():
+    return [
+        {"ndvi": ndvi, "precipitation": precipitation, "sentinel": sentinel}
+        for ndvi, precipitation, sentinel in itertools.product(NDVI, PRECIPITATION, SENTINEL)
+    ]
+
+
+def random_env_data(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"ndvi": float(ndvi), "precipitation": float(precipitation), "sentinel": float(sentinel)}
+        for ndvi, precipitation, sentinel in zip(
+            rng.uniform(-0.2, 1.2, count), rng.uniform(0, 500, count), rng.uniform(-30, 5, count)
+        )
+    ]
+
+
+def tie_env_data():
+    # Two decimal inputs put many weighted sums on a .x5 rounding tie
+    return [
+        {"ndvi": ndvi / 100, "precipitation": precipitation, "sentinel": sentinel / 10}
+        for ndvi in range(0, 101, 3) for precipitation in range(0, 401, 7) for sentinel in range(-200, 1, 9)
+    ]
+
+
+PARTIAL_ENV_DATA = [
+    {"error": "Failed to fetch environmental data"},
+    {"error": "Invalid province", "ndvi": 0.9},
+    {},
+    {"ndvi": 0.7},
+    {"precipitation": 120},
+    {"sentinel": -5}
+]
+
+
+@pytest.mark.parametrize("env_data_list", [
+    boundary_env_data(), random_env_data(20000), tie_env_data(), PARTIAL_ENV_DATA
+], ids=["boundaries", "random", "ties", "partial"])
+def test_environmental_scores_match_scalar(env_data_list):
+    expected = [environmental_score(env_data) for env_data in env_data_list]
+    assert region_environmental_scores(env_data_list).tolist() == expected
+
+
+def test_environmental_scores_of_error_dicts_are_neutral():
+    assert region_environmental_scores(PARTIAL_ENV_DATA[:2]).tolist() == [50.0, 50.0]
+
+
+@pytest.mark.parametrize("env_data_list", [
+    boundary_env_data(), random_env_data(20000, seed=1), tie_env_data(), PARTIAL_ENV_DATA
+], ids=["boundaries", "random", "ties", "partial"])
+def test_investment_scores_match_scalar(env_data_list):
+    rng = np.random.default_rng(2)
+    count = len(env_data_list)
+    poverty_indices = [float(value) for value in rng.uniform(-20, 120, count)]
+    # Boundaries and strings standing for a failed poverty prediction
+    for index, value in enumerate([0, 100, -0.001, 100.001, "Error", "Not Available", 50]):
+        poverty_indices[index % count] = value
+    infrastructures = [INFRASTRUCTURES[i % len(INFRASTRUCTURES)] for i in range(count)]
+
+    expected = [
+        investment_score(env_data, poverty_index, infrastructure, INFRA_COSTS)
+        for env_data, poverty_index, infrastructure in zip(env_data_list, poverty_indices, infrastructures)
+    ]
+    actual = region_investment_scores(env_data_list, poverty_indices, infrastructures, INFRA_COSTS)
+    assert actual.tolist() == expected
+
+
+def test_string_poverty_index_counts_as_50():
+    env_data = {"ndvi": 0.6, "precipitation": 150, "sentinel": -8}
+    expected = investment_score(env_data, 50.0, "Biopori", INFRA_COSTS)
+    assert investment_score(env_data, "Error", "Biopori", INFRA_COSTS) == expected
+    assert region_investment_scores([env_data], ["Error"], ["Biopori"], INFRA_COSTS).tolist() == [expected]
+
+
+def test_empty_batch():
+    assert region_environmental_scores([]).tolist() == []
+    assert region_investment_scores([], [], [], INFRA_COSTS).tolist() == []
+
+
+def test_default_weight_sweep_reproduces_live_scores():
+    env_data_list = random_env_data(20000, seed=3) + tie_env_data()
+    count = len(env_data_list)
+    rng = np.random.default_rng(4)
+    poverty_indices = rng.uniform(-20, 120, count)
+    infrastructures = [INFRASTRUCTURES[i % len(INFRASTRUCTURES)] for i in range(count)]
+    max_cost = max(INFRA_COSTS.values())
+
+    scores, ranks = weight_sweep(
+        [env_data["ndvi"] for env_data in env_data_list],
+        [env_data["precipitation"] for env_data in env_data_list],
+        [env_data["sentinel"] for env_data in env_data_list],
+        poverty_indices,
+        [INFRA_COSTS.get(infrastructure, max_cost / 2) for infrastructure in infrastructures],
+        max_cost,
+        [ENVIRONMENTAL_WEIGHTS],
+        [INVESTMENT_WEIGHTS]
+    )
+    expected = [
+        investment_score(env_data, float(poverty_index), infrastructure, INFRA_COSTS)
+        for env_data, poverty_index, infrastructure in zip(env_data_list, poverty_indices, infrastructures)
+    ]
+    assert scores[0].tolist() == expected
+
+    # Ties keep region order
+    order = sorted(range(count), key=lambda i: (-expected[i], i))
+    assert ranks[0][order].tolist() == list(range(1, count + 1))